@@ -1,3 +1,58 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Ad, AdFingerprint, Comment, Job, PurgeJob
+from .purge import schedule_ad_deletion
+
+
+class SoftDeleteAdmin(admin.ModelAdmin):
+    """Показывает и удаленные строки, позволяет их восстановить."""
+
+    list_filter = (("deleted_at", admin.EmptyFieldListFilter),)
+    actions = ["restore"]
+
+    def get_queryset(self, request):
+        return self.model.all_objects.all()
+
+    @admin.action(description="Восстановить")
+    def restore(self, request, queryset):
+        queryset.restore()
+
+
+@admin.register(Ad)
+class AdAdmin(SoftDeleteAdmin):
+    list_display = ("id", "title", "author", "created_at", "deleted_at")
+    actions = ["restore", "purge"]
+
+    @admin.action(description="Удалить окончательно (в фоне)")
+    def purge(self, request, queryset):
+        for ad in queryset:
+            schedule_ad_deletion(ad)
+
+
+@admin.register(Comment)
+class CommentAdmin(SoftDeleteAdmin):
+    list_display = ("id", "ad", "author", "is_hidden", "created_at", "deleted_at")
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "target", "object_id", "status", "deleted_rows", "created_at")
+    list_filter = ("status", "target")
+    readonly_fields = ("deleted_rows", "error", "created_at", "finished_at")
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "key", "status", "attempts", "run_after")
+    list_filter = ("status", "kind")
+    readonly_fields = ("lock_token", "locked_until", "error", "created_at")
+
+
+@admin.register(AdFingerprint)
+class AdFingerprintAdmin(admin.ModelAdmin):
+    """Помеченные дубли: фильтр «duplicate_of — не пусто»."""
+
+    list_display = ("ad", "duplicate_of", "created_at")
+    list_filter = (("duplicate_of", admin.EmptyFieldListFilter),)
+    raw_id_fields = ("ad", "duplicate_of")
+    readonly_fields = ("text_hash", "image_hash", "created_at")
@@ -0,0 +1,122 @@
+# ads/archive.py
+from django.db import transaction
+
+from .caching import invalidate_counts_for_authors
+from .models import Ad, Comment, ArchivedAd, ArchivedComment
+from .purge import _purge_dependents
+
+
+def _copied_fields(model):
+    # Все колонки архивной модели, кроме своих служебных: новое поле в
+    # архиве сразу начинает копироваться
+    return tuple(
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.name != "archived_at"
+    )
+
+
+AD_FIELDS = _copied_fields(ArchivedAd)
+COMMENT_FIELDS = _copied_fields(ArchivedComment)
+
+
+def archive_ads(queryset, batch_size):
+    """Переносит объявления из queryset (вместе с комментариями) в архив.
+
+    Каждая пачка копируется и удаляется в одной транзакции, поэтому
+    прерванный перенос безопасно повторить. Возвращает число объявлений.
+    """
+    total = 0
+    for batch in _pk_batches(queryset, batch_size):
+        with transaction.atomic():
+            ArchivedAd.objects.bulk_create(
+                [
+                    ArchivedAd(**row)
+                    for row in Ad.all_objects.filter(pk__in=batch).values(*AD_FIELDS)
+                ],
+                ignore_conflicts=True,
+            )
+            _copy_comments(Comment.all_objects.filter(ad_id__in=batch), batch_size)
+            # Зависимые строки (комментарии и пр.) удаляются пачками
+            _purge_dependents(Ad, batch, batch_size, lambda count: None)
+            authors = list(
+                Ad.all_objects.filter(pk__in=batch)
+                .values_list("author_id", flat=True)
+                .distinct()
+            )
+            Ad.all_objects.filter(pk__in=batch)._raw_delete(Ad.all_objects.db)
+        invalidate_counts_for_authors(authors)
+        total += len(batch)
+    return total
+
+
+def archive_comments(queryset, batch_size):
+    """Переносит отдельные комментарии из queryset в архив."""
+    total = 0
+    for batch in _pk_batches(queryset, batch_size):
+        with transaction.atomic():
+            _copy_comments(Comment.all_objects.filter(pk__in=batch), batch_size)
+            Comment.all_objects.filter(pk__in=batch)._raw_delete(Comment.all_objects.db)
+        total += len(batch)
+    return total
+
+
+def _pk_batches(queryset, batch_size):
+    """Первичные ключи queryset пачками, по возрастанию pk.
+
+    Keyset по pk: каждая пачка продолжает обход индекса первичного ключа с
+    места, где остановилась прошлая, а не сканирует заново строки, не
+    подошедшие под фильтр.
+    """
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
+
+
+def _copy_comments(queryset, batch_size):
+    rows = queryset.order_by().values(*COMMENT_FIELDS).iterator(chunk_size=batch_size)
+    chunk = []
+    for row in rows:
+        chunk.append(ArchivedComment(**row))
+        if len(chunk) >= batch_size:
+            ArchivedComment.objects.bulk_create(chunk, ignore_conflicts=True)
+            chunk = []
+    if chunk:
+        ArchivedComment.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def prune_archive(cutoff, batch_size):
+    """Удаляет из архива объявления, созданные раньше cutoff, с комментариями.
+
+    Вторым проходом удаляет и прочие комментарии старше cutoff: перенесенные
+    поодиночке, чье объявление в архив так и не попало (например, удалено
+    через purge_deleted).
+    """
+    total = 0
+    queryset = ArchivedAd.objects.filter(created_at__lt=cutoff)
+    while True:
+        batch = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            comments = ArchivedComment.objects.filter(ad_id__in=batch)
+            comments._raw_delete(comments.db)
+            ads = ArchivedAd.objects.filter(pk__in=batch)
+            ads._raw_delete(ads.db)
+        total += len(batch)
+
+    queryset = ArchivedComment.objects.filter(created_at__lt=cutoff)
+    while True:
+        batch = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+        if not batch:
+            return total
+        comments = ArchivedComment.objects.filter(pk__in=batch)
+        comments._raw_delete(comments.db)
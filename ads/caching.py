@@ -0,0 +1,55 @@
+# ads/caching.py
+import math
+
+from django.conf import settings
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from config.cache import tiered
+
+COUNT_SCOPES = ("all", "active")
+
+
+def _count_key(author_id, scope):
+    return f"ads:author_count:{author_id}:{scope}"
+
+
+def author_ads_count(author_id, scope, queryset):
+    """Число объявлений автора из кеша; при промахе считается по queryset.
+
+    Для scope="active" значение живет не дольше, чем до ближайшего
+    expires_at: в этот момент объявление выпадает из active() без всякой
+    записи в базу, и сбросить кеш было бы некому.
+    """
+    key = _count_key(author_id, scope)
+    count = tiered.get(key)
+    if count is not None:
+        return count
+
+    timeout = settings.AUTHOR_ADS_COUNT_TIMEOUT
+    if scope == "active":
+        stats = queryset.aggregate(count=Count("pk"), next_expiry=Min("expires_at"))
+        count = stats["count"]
+        if stats["next_expiry"] is not None:
+            left = (stats["next_expiry"] - timezone.now()).total_seconds()
+            timeout = max(0, min(timeout, math.ceil(left)))
+    else:
+        count = queryset.count()
+    if timeout:
+        tiered.set(key, count, timeout)
+    return count
+
+
+def invalidate_author_counts(author_id):
+    tiered.delete_many([_count_key(author_id, scope) for scope in COUNT_SCOPES])
+
+
+def invalidate_counts_for_authors(author_ids):
+    """Сброс для пакетных операций (expire_ads, архив, purge)."""
+    tiered.delete_many(
+        [
+            _count_key(author_id, scope)
+            for author_id in set(author_ids)
+            for scope in COUNT_SCOPES
+        ]
+    )
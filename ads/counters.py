@@ -0,0 +1,111 @@
+# ads/counters.py
+"""Буфер счетчиков просмотров с отложенной записью.
+
+Просмотры копятся в памяти процесса и раз в ADS_VIEWS_FLUSH_INTERVAL секунд
+записываются в БД пакетными UPDATE ... CASE, поэтому GET объявления не
+превращается в конкурентную запись в одну строку. Буфер также сбрасывается
+при штатной остановке воркера (atexit); при аварийном падении теряются
+просмотры максимум за один интервал.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, PositiveBigIntegerField, Value, When
+
+from . import trending
+from .models import Ad
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = Counter()
+_flusher = None
+
+
+def record_view(ad_id):
+    with _lock:
+        _pending[ad_id] += 1
+    _ensure_flusher()
+
+
+def pending(ad_id):
+    """Еще не записанные в БД просмотры (для приблизительного счетчика)."""
+    return _pending.get(ad_id, 0)
+
+
+def flush(batch_size=None):
+    """Записывает накопленные просмотры в БД. Возвращает словарь приращений."""
+
+    with _lock:
+        deltas = dict(_pending)
+        _pending.clear()
+    if not deltas:
+        return deltas
+
+    batch_size = batch_size or settings.ADS_VIEWS_FLUSH_BATCH_SIZE
+    items = list(deltas.items())
+    start = 0
+    try:
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            Ad.all_objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                views=F("views")
+                + Case(
+                    *[When(pk=pk, then=Value(count)) for pk, count in batch],
+                    default=Value(0),
+                    output_field=PositiveBigIntegerField(),
+                )
+            )
+    except Exception:
+        # Каждая пачка коммитится сама, поэтому в буфер возвращается только
+        # незаписанный хвост: иначе записанные пачки посчитались бы дважды
+        with _lock:
+            _pending.update(dict(items[start:]))
+        raise
+    trending.record_views(deltas)
+    return deltas
+
+
+def clear():
+    """Отбрасывает буфер (для тестов)."""
+    with _lock:
+        _pending.clear()
+
+
+def _safe_flush():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Не удалось записать счетчики просмотров")
+
+
+def _flush_loop(stop):
+    while not stop.wait(settings.ADS_VIEWS_FLUSH_INTERVAL):
+        _safe_flush()
+        # Соединения фонового потока не должны висеть между сбросами
+        connections.close_all()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None or not settings.ADS_VIEWS_FLUSH_INTERVAL:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        stop = threading.Event()
+        _flusher = threading.Thread(
+            target=_flush_loop, args=(stop,), name="ad-views-flusher", daemon=True
+        )
+        _flusher.start()
+        atexit.register(_shutdown, stop)
+
+
+def _shutdown(stop):
+    stop.set()
+    _safe_flush()
@@ -0,0 +1,61 @@
+# ads/filters.py
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from . import geo
+
+
+class NearFilterBackend(BaseFilterBackend):
+    """Фильтр ?near=lat,lng&radius=км с сортировкой по расстоянию.
+
+    Кандидаты выбираются диапазонами по индексу geohash (до 9 ячеек),
+    точное расстояние считается только для них.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        near = request.query_params.get("near")
+        if not near:
+            return queryset
+
+        try:
+            latitude, longitude = (float(value) for value in near.split(","))
+            radius = float(
+                request.query_params.get("radius", settings.ADS_NEAR_DEFAULT_RADIUS_KM)
+            )
+        except ValueError:
+            raise ValidationError(
+                {"near": "Ожидается near=широта,долгота и radius в км."}
+            )
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({"near": "Координаты вне допустимого диапазона."})
+        if not 0 < radius <= settings.ADS_NEAR_MAX_RADIUS_KM:
+            raise ValidationError(
+                {"radius": f"Радиус от 0 до {settings.ADS_NEAR_MAX_RADIUS_KM} км."}
+            )
+
+        cells = Q()
+        for prefix in geo.covering_cells(latitude, longitude, radius):
+            # Диапазон вместо LIKE: на SQLite LIKE не использует индекс
+            cells |= Q(geohash__gte=prefix, geohash__lt=prefix + "{")
+
+        return (
+            queryset.filter(cells)
+            .annotate(distance=geo.distance_expression(latitude, longitude))
+            .filter(distance__lte=radius)
+            .order_by("distance", "-created_at")
+        )
+
+
+class TrendingOrderingFilter(BaseFilterBackend):
+    """?ordering=trending — лента по предрассчитанной популярности.
+
+    Внутреннее соединение с AdScore позволяет идти по индексу score без
+    сортировки; объявления без активности в ленту не попадают.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get("ordering") != "trending":
+            return queryset
+        return queryset.filter(score__score__gt=0).order_by("-score__score")
@@ -0,0 +1,219 @@
+# ads/fingerprint.py
+"""Поиск почти одинаковых объявлений по отпечаткам содержимого.
+
+Текст сводится к 64-битному SimHash (слова и пары слов, заголовок с
+двойным весом), картинка — к 64-битному dHash. Объявления одного автора
+считаются дублями, если текст или картинка отличаются не более чем в
+MAX_DISTANCE битах. Для поиска без полного перебора отпечаток режется на
+MAX_DISTANCE + 1 отрезков: у близких отпечатков хотя бы один отрезок
+совпадает (принцип Дирихле), поэтому кандидаты выбираются по индексу
+AdFingerprintBand.
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from .models import Ad, AdFingerprint, AdFingerprintBand
+
+BITS = 64
+MAX_DISTANCE = 3
+BANDS = MAX_DISTANCE + 1
+TEXT, IMAGE = 0, 1
+WORD_RE = re.compile(r"\w+")
+
+
+def _hash64(token):
+    return int.from_bytes(
+        hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def _features(title, description):
+    for text, weight in ((title, 2), (description, 1)):
+        words = WORD_RE.findall(text.lower())
+        for word in words:
+            yield word, weight
+        for pair in zip(words, words[1:]):
+            yield " ".join(pair), weight
+
+
+def simhash(title, description):
+    totals = [0] * BITS
+    for token, weight in _features(title, description):
+        value = _hash64(token)
+        for bit in range(BITS):
+            totals[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def dhash(file):
+    """dHash картинки (None, если файл не читается). Позиция файла сохраняется."""
+    position = file.tell()
+    try:
+        with Image.open(file) as image:
+            pixels = list(
+                image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata()
+            )
+    except (OSError, UnidentifiedImageError):
+        return None
+    finally:
+        file.seek(position)
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            value = value << 1 | (left > right)
+    return value
+
+
+def distance(a, b):
+    return bin((a ^ b) & (1 << BITS) - 1).count("1")
+
+
+def _signed(value):
+    return value - (1 << BITS) if value >= 1 << BITS - 1 else value
+
+
+def _band_keys(kind, value):
+    width = -(-BITS // BANDS)
+    value &= (1 << BITS) - 1
+    for band in range(BANDS):
+        part = value >> band * width & (1 << width) - 1
+        yield kind << 56 | band << 48 | part
+
+
+def compute(title, description, image=None):
+    """Пара (text_hash, image_hash) для содержимого объявления."""
+    image_hash = None
+    if image:
+        image_hash = dhash(image)
+    return simhash(title, description), image_hash
+
+
+def is_duplicate(a, b):
+    """Близкий текст или близкая картинка; признаки проверяются независимо."""
+    text_a, image_a = a
+    text_b, image_b = b
+    if distance(text_a, text_b) <= MAX_DISTANCE:
+        return True
+    return (
+        image_a is not None
+        and image_b is not None
+        and distance(image_a, image_b) <= MAX_DISTANCE
+    )
+
+
+def find_duplicate(fingerprint, author_id, exclude_pk=None, before_pk=None):
+    """Самое старое неудаленное объявление автора, почти совпадающее с
+    fingerprint. Чужие объявления не сравниваются: id дубля попадает в
+    ответ API и не должен раскрывать черновики и скрытые объявления
+    других пользователей."""
+    text_hash, image_hash = fingerprint
+    keys = list(_band_keys(TEXT, text_hash))
+    if image_hash is not None:
+        keys += _band_keys(IMAGE, image_hash)
+    candidates = AdFingerprint.objects.filter(
+        bands__key__in=keys, ad__author_id=author_id, ad__deleted_at__isnull=True
+    )
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+    if before_pk is not None:
+        candidates = candidates.filter(pk__lt=before_pk)
+    rows = (
+        candidates.distinct()
+        .order_by("pk")
+        .values_list("pk", "text_hash", "image_hash")
+    )
+    for pk, other_text, other_image in rows:
+        if is_duplicate(fingerprint, (other_text, other_image)):
+            return pk
+    return None
+
+
+@transaction.atomic
+def store(ad, fingerprint, duplicate_of=None):
+    """Сохраняет отпечатки ad и пересобирает его строки в LSH-индексе."""
+    text_hash, image_hash = fingerprint
+    record, _ = AdFingerprint.objects.update_or_create(
+        ad=ad,
+        defaults={
+            "text_hash": _signed(text_hash),
+            "image_hash": None if image_hash is None else _signed(image_hash),
+            "duplicate_of_id": duplicate_of,
+        },
+    )
+    record.bands.all().delete()
+    keys = list(_band_keys(TEXT, text_hash))
+    if image_hash is not None:
+        keys += _band_keys(IMAGE, image_hash)
+    AdFingerprintBand.objects.bulk_create(
+        AdFingerprintBand(fingerprint=record, key=key) for key in keys
+    )
+    return record
+
+
+def for_ad(ad):
+    """Отпечатки сохраненного объявления; картинка читается из хранилища."""
+    image_hash = None
+    if ad.image:
+        try:
+            with ad.image.open("rb") as file:
+                image_hash = dhash(file)
+        except OSError:
+            pass
+    return simhash(ad.title, ad.description), image_hash
+
+
+def refresh(ad):
+    """Пересчитывает отпечатки после изменения содержимого объявления."""
+    if settings.ADS_DUPLICATE_POLICY == "off":
+        return
+    content = for_ad(ad)
+    store(ad, content, find_duplicate(content, ad.author_id, exclude_pk=ad.pk))
+
+
+def dedupe(batch_size, rebuild=False, delete=False):
+    """Проверяет каталог: у каждого объявления ищет более старый дубль
+    того же автора.
+
+    Объявления обходятся по возрастанию pk, поэтому оригиналом считается
+    самое раннее. Отпечатки считаются для объявлений без них (или для всех
+    при rebuild). С delete дубли мягко удаляются. Возвращает пару
+    (проверено, найдено дублей).
+    """
+    if rebuild:
+        AdFingerprintBand.objects.all()._raw_delete(AdFingerprintBand.objects.db)
+        AdFingerprint.objects.all()._raw_delete(AdFingerprint.objects.db)
+
+    checked = duplicates = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Ad.objects.filter(pk__gt=last_pk)
+            .select_related("fingerprint")
+            .order_by("pk")[:batch_size]
+        )
+        if not batch:
+            return checked, duplicates
+        for ad in batch:
+            record = getattr(ad, "fingerprint", None)
+            if record is None:
+                content = for_ad(ad)
+            else:
+                content = (record.text_hash, record.image_hash)
+            duplicate_of = find_duplicate(content, ad.author_id, before_pk=ad.pk)
+            if record is None:
+                store(ad, content, duplicate_of)
+            elif record.duplicate_of_id != duplicate_of:
+                record.duplicate_of_id = duplicate_of
+                record.save(update_fields=["duplicate_of"])
+            if duplicate_of is not None:
+                duplicates += 1
+                if delete:
+                    ad.soft_delete()
+        checked += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,106 @@
+# ads/gallery.py
+"""Галерея объявления: прием картинок и миниатюры.
+
+Картинки одного запроса декодируются и уменьшаются параллельно в пуле
+потоков: Pillow отпускает GIL. Сохранение в хранилище (оно учитывает файлы
+в MediaBlob) и bulk_create строк AdImage выполняются в потоке запроса.
+Расширение файла берется из формата, распознанного Pillow, а не из имени
+клиента.
+Миниатюра первой картинки копируется в Ad.cover, чтобы лента не
+обращалась к таблице галереи.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.validators import validate_image_file_extension
+from django.db import transaction
+from django.db.models import Max
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import Ad, AdImage
+
+
+class GalleryError(Exception):
+    pass
+
+
+def make_thumbnail(file):
+    """Расширение по формату картинки и JPEG-миниатюра не больше
+    ADS_THUMBNAIL_SIZE с учетом EXIF-поворота."""
+    try:
+        with Image.open(file) as image:
+            extension = f".{image.format.lower()}"
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(settings.ADS_THUMBNAIL_SIZE)
+            buffer = BytesIO()
+            image.convert("RGB").save(buffer, format="JPEG", quality=85)
+    except (OSError, UnidentifiedImageError):
+        raise GalleryError(f"{file.name}: файл не является изображением.")
+    finally:
+        file.seek(0)
+    try:
+        # Имя клиента не используется: картинка, одновременно валидная как
+        # HTML, иначе сохранилась бы как .html и отдавалась бы как страница
+        validate_image_file_extension(File(None, f"image{extension}"))
+    except ValidationError:
+        raise GalleryError(f"{file.name}: неподдерживаемый формат изображения.")
+    return extension, ContentFile(buffer.getvalue())
+
+
+def _store(file, extension, thumbnail):
+    image = AdImage._meta.get_field("image")
+    stem = os.path.splitext(os.path.basename(file.name))[0]
+    return (
+        image.storage.save(image.generate_filename(None, stem + extension), file),
+        image.storage.save(
+            AdImage._meta.get_field("thumbnail").generate_filename(None, stem + ".jpg"),
+            thumbnail,
+        ),
+    )
+
+
+def add_images(ad, files):
+    """Добавляет картинки в конец галереи ad и возвращает новые AdImage."""
+    if ad.images.count() + len(files) > settings.ADS_GALLERY_MAX_IMAGES:
+        raise GalleryError(
+            f"В галерее не больше {settings.ADS_GALLERY_MAX_IMAGES} картинок."
+        )
+    with ThreadPoolExecutor(settings.ADS_GALLERY_UPLOAD_WORKERS) as pool:
+        futures = [pool.submit(make_thumbnail, file) for file in files]
+    errors = [str(f.exception()) for f in futures if f.exception() is not None]
+    if errors:
+        raise GalleryError(" ".join(errors))
+
+    with transaction.atomic():
+        stored = [_store(file, *f.result()) for file, f in zip(files, futures)]
+        start = ad.images.aggregate(last=Max("position"))["last"]
+        start = 0 if start is None else start + 1
+        images = AdImage.objects.bulk_create(
+            AdImage(ad=ad, image=image, thumbnail=thumbnail, position=start + i)
+            for i, (image, thumbnail) in enumerate(stored)
+        )
+        update_cover(ad)
+    return images
+
+
+def delete_image(image):
+    """Удаляет картинку галереи; файлы освобождаются после фиксации."""
+    image.delete()
+    names = [image.image.name, image.thumbnail.name]
+    storage = AdImage._meta.get_field("image").storage
+    transaction.on_commit(lambda: [storage.delete(name) for name in names])
+    update_cover(image.ad)
+
+
+def update_cover(ad):
+    """Копирует миниатюру первой картинки галереи в Ad.cover."""
+    first = ad.images.order_by("position", "pk").values_list("thumbnail", flat=True)
+    cover = first.first() or ""
+    Ad.all_objects.filter(pk=ad.pk).update(cover=cover)
+    ad.cover = cover
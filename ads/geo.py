@@ -0,0 +1,94 @@
+# ads/geo.py
+"""Geohash и расстояния для поиска объявлений рядом.
+
+Geohash — строка, у которой общий префикс означает общую ячейку сетки,
+поэтому поиск по области сводится к диапазонам B-tree индекса и работает
+на любой БД, включая SQLite.
+"""
+
+import math
+
+from django.db.models import F
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0
+MAX_PRECISION = 12
+
+
+def encode(latitude, longitude, precision=MAX_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    result = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(result) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            result.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(result)
+
+
+def cell_size(precision):
+    """Размер ячейки в градусах: (широта, долгота)."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def precision_for_radius(latitude, radius_km):
+    """Самая мелкая точность, при которой ячейка не меньше радиуса.
+
+    Тогда круг поиска целиком лежит в центральной ячейке и 8 соседних.
+    """
+    lng_scale = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(MAX_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size(precision)
+        height_km = lat_deg * 110.574
+        width_km = lng_deg * 111.320 * lng_scale
+        if min(height_km, width_km) >= radius_km:
+            return precision
+    return 1
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Префиксы geohash (до 9 ячеек), покрывающие круг поиска."""
+    precision = precision_for_radius(latitude, radius_km)
+    lat_deg, lng_deg = cell_size(precision)
+    cells = set()
+    for dlat in (-lat_deg, 0, lat_deg):
+        lat = min(max(latitude + dlat, -90.0), 90.0)
+        for dlng in (-lng_deg, 0, lng_deg):
+            lng = (longitude + dlng + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def distance_expression(latitude, longitude):
+    """Расстояние (км) от точки до Ad.latitude/longitude по формуле гаверсинуса."""
+    lat1 = math.radians(latitude)
+    lat2 = Radians(F("latitude"))
+    dlat = lat2 - lat1
+    dlng = Radians(F("longitude")) - math.radians(longitude)
+    a = Power(Sin(dlat / 2), 2) + math.cos(lat1) * Cos(lat2) * Power(Sin(dlng / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
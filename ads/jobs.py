@@ -0,0 +1,133 @@
+# ads/jobs.py
+"""Очередь фоновых заданий в базе данных.
+
+Воркер (команда run_jobs) забирает пачку созревших заданий, помечая их
+своим токеном. На PostgreSQL строки выбираются через SELECT ... FOR UPDATE
+SKIP LOCKED, и воркеры не ждут друг друга. На SQLite запись в базу
+последовательна, поэтому пачка захватывается одним UPDATE с подзапросом.
+Задания с тем же key, что у захваченных, забираются вместе с ними: так
+уведомления одному адресату сворачиваются в одно письмо.
+"""
+
+import logging
+import uuid
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import notifications
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Обработчик получает список заданий своего вида и обрабатывает их разом
+HANDLERS = {
+    "comment_notification": notifications.send_comment_digests,
+}
+
+
+def enqueue(kind, payload, key="", delay=0):
+    return Job.objects.create(
+        kind=kind,
+        key=key,
+        payload=payload,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(kind, payload, key="", delay=0):
+    """Ставит задание после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: enqueue(kind, payload, key, delay))
+
+
+def claim(batch_size):
+    """Захватывает до batch_size созревших заданий и возвращает их список."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    changes = {
+        "status": Job.Status.RUNNING,
+        "lock_token": token,
+        "locked_until": now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+        "attempts": F("attempts") + 1,
+    }
+    due = Job.objects.filter(
+        Q(status=Job.Status.PENDING, run_after__lte=now)
+        | Q(status=Job.Status.RUNNING, locked_until__lt=now)
+    ).order_by("run_after")
+
+    with transaction.atomic():
+        _take(due[:batch_size], changes)
+        keys = (
+            Job.objects.filter(lock_token=token)
+            .exclude(key="")
+            .values_list("key", flat=True)
+            .distinct()
+        )
+        # Отложенные задания тех же адресатов уходят одной пачкой
+        _take(
+            Job.objects.filter(status=Job.Status.PENDING, key__in=list(keys)), changes
+        )
+    return list(Job.objects.filter(lock_token=token).order_by("kind", "pk"))
+
+
+def _take(queryset, changes):
+    if connection.features.has_select_for_update_skip_locked:
+        # Строки, заблокированные другим воркером, просто пропускаются
+        pks = list(
+            queryset.select_for_update(skip_locked=True).values_list("pk", flat=True)
+        )
+        return Job.objects.filter(pk__in=pks).update(**changes)
+    # SQLite: UPDATE с подзапросом выполняется под блокировкой записи всей
+    # базы, поэтому две копии воркера не захватят одну строку
+    return Job.objects.filter(pk__in=queryset.values("pk")).update(**changes)
+
+
+def process(jobs):
+    """Выполняет захваченные задания, сгруппировав их по виду."""
+    for kind, group in groupby(jobs, key=lambda job: job.kind):
+        group = list(group)
+        pks = [job.pk for job in group]
+        try:
+            HANDLERS[kind](group)
+        except Exception as exc:
+            logger.exception("Задания %s %s упали", kind, pks)
+            _fail(group, exc)
+        else:
+            # Удаляются только строки, которые все еще за этим воркером: если
+            # аренда истекла и задания перехватил другой, их выполнит он
+            deleted, _ = Job.objects.filter(
+                pk__in=pks, lock_token=group[0].lock_token
+            ).delete()
+            if deleted < len(pks):
+                logger.warning("Аренда заданий %s %s потеряна", kind, pks)
+
+
+def _fail(jobs, exc):
+    now = timezone.now()
+    for job in jobs:
+        if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+            changes = {"status": Job.Status.FAILED}
+        else:
+            # Экспоненциальная пауза перед повтором
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            changes = {
+                "status": Job.Status.PENDING,
+                "run_after": now + timedelta(seconds=delay),
+            }
+        updated = Job.objects.filter(pk=job.pk, lock_token=job.lock_token).update(
+            error=repr(exc), lock_token="", locked_until=None, **changes
+        )
+        if not updated:
+            logger.warning("Аренда задания %s потеряна", job.pk)
+
+
+def run_once(batch_size=None):
+    """Одна итерация воркера; возвращает число обработанных заданий."""
+    jobs = claim(batch_size or settings.JOBS_BATCH_SIZE)
+    if jobs:
+        process(jobs)
+    return len(jobs)
@@ -0,0 +1,73 @@
+# ads/management/commands/archive_ads.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ads.archive import archive_ads, archive_comments, prune_archive
+from ads.models import Ad, AdStatus, Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит удаленные и устаревшие объявления в архивные таблицы, "
+        "чтобы основная таблица содержала только актуальные строки"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tombstone-days",
+            type=int,
+            default=settings.ARCHIVE_TOMBSTONES_AFTER_DAYS,
+            help="Сколько дней удаленные строки остаются восстановимыми",
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=int,
+            default=settings.ADS_HOT_RETENTION_DAYS,
+            help=(
+                "Проданные и истекшие объявления старше (по created_at) уходят "
+                "в архив; 0 — отключить"
+            ),
+        )
+        parser.add_argument(
+            "--include-active",
+            action="store_true",
+            help="Переносить по возрасту и активные объявления (необратимо)",
+        )
+        parser.add_argument(
+            "--archive-retention-days",
+            type=int,
+            default=settings.ARCHIVE_RETENTION_DAYS,
+            help="Сколько дней хранить архив (по created_at); 0 — бессрочно",
+        )
+        parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options["batch_size"]
+
+        cutoff = now - timedelta(days=options["tombstone_days"])
+        ads = archive_ads(Ad.all_objects.filter(deleted_at__lt=cutoff), batch_size)
+        comments = archive_comments(
+            Comment.all_objects.filter(deleted_at__lt=cutoff), batch_size
+        )
+
+        # Обе выборки идут пачками по первичному ключу (ads.archive), так что
+        # таблица просматривается за проход один раз
+        if options["max_age_days"]:
+            cutoff = now - timedelta(days=options["max_age_days"])
+            old_ads = Ad.all_objects.filter(created_at__lt=cutoff)
+            if not options["include_active"]:
+                old_ads = old_ads.filter(status__in=[AdStatus.SOLD, AdStatus.EXPIRED])
+            ads += archive_ads(old_ads, batch_size)
+
+        self.stdout.write(
+            f"В архив перенесено объявлений: {ads}, комментариев: {comments}"
+        )
+
+        if options["archive_retention_days"]:
+            cutoff = now - timedelta(days=options["archive_retention_days"])
+            pruned = prune_archive(cutoff, batch_size)
+            self.stdout.write(f"Из архива удалено объявлений: {pruned}")
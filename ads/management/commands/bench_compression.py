@@ -0,0 +1,97 @@
+# ads/management/commands/bench_compression.py
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from ads.models import Ad, Comment
+from config.middleware import CODECS, compressed_key
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Замер сжатия ленты объявлений: байт и CPU на запрос по кодировкам"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--iterations", type=int, default=200)
+        parser.add_argument(
+            "--ads",
+            type=int,
+            default=20,
+            help="Сколько объявлений создать; замеряется первая страница ленты "
+            "(REST_FRAMEWORK PAGE_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        client = Client()
+        cache = caches[settings.COMPRESSION_CACHE]
+
+        # Тестовые данные удаляются откатом транзакции
+        with transaction.atomic():
+            author = User.objects.create_user(
+                email="bench-gzip@example.com", password="BenchPass123"
+            )
+            ads = Ad.objects.bulk_create(
+                Ad(
+                    title=f"Объявление {i}",
+                    description="Подробное описание товара. " * 10,
+                    price=1000 + i,
+                    author=author,
+                )
+                for i in range(options["ads"])
+            )
+            Comment.objects.bulk_create(
+                Comment(text="Еще актуально? " * 3, author=author, ad=ad)
+                for ad in ads
+                for _ in range(3)
+            )
+
+            self.stdout.write(
+                f"Объявлений на странице: {settings.REST_FRAMEWORK['PAGE_SIZE']}"
+            )
+            self.stdout.write(
+                f"{'кодировка':<10} {'байт':>8} {'CPU холод':>10} "
+                f"{'CPU кеш':>10} {'сжатие':>10}"
+            )
+            # Прогрев: импорты и первые запросы не попадают в замер
+            body = client.get("/api/ads/").content
+            for encoding in ["identity", *CODECS]:
+                key = compressed_key(body, encoding)
+                cold_cpu, size = self._measure(client, encoding, iterations, cache, key)
+                warm_cpu, _ = self._measure(client, encoding, iterations)
+                cache.delete(key)
+                codec_cpu = 0.0
+                if encoding in CODECS:
+                    start = time.process_time()
+                    for _ in range(iterations):
+                        CODECS[encoding](body)
+                    codec_cpu = (time.process_time() - start) / iterations
+                self.stdout.write(
+                    f"{encoding:<10} {size:>8} {cold_cpu * 1000:>8.2f}мс "
+                    f"{warm_cpu * 1000:>8.2f}мс {codec_cpu * 1000:>8.3f}мс"
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(
+            "CPU холод/кеш — на запрос целиком без кеша сжатия и с ним; "
+            "сжатие — только кодек"
+        )
+
+    def _measure(self, client, encoding, iterations, cache=None, key=None):
+        """CPU на запрос; с cache — каждый запрос сжимает заново.
+
+        Из кеша удаляется только ключ сжатой ленты: COMPRESSION_CACHE —
+        общий кеш, и clear() стер бы чужие значения (на redis — FLUSHDB).
+        """
+        cpu = 0.0
+        for _ in range(iterations):
+            if cache is not None:
+                cache.delete(key)
+            start = time.process_time()
+            response = client.get("/api/ads/", HTTP_ACCEPT_ENCODING=encoding)
+            cpu += time.process_time() - start
+        cpu /= iterations
+        return cpu, len(response.content)
@@ -0,0 +1,42 @@
+# ads/management/commands/bench_middleware.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер накладных расходов middleware на запрос к API: полный и облегченный стек"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--iterations", type=int, default=2000)
+        parser.add_argument(
+            "--path",
+            default="/api/ads/suggest/",
+            help="Дешевый эндпоинт, чтобы в замере преобладал стек middleware",
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        # Прогрев: импорты, индекс подсказок, первые запросы
+        for _ in range(10):
+            client.get(options["path"])
+
+        results = {}
+        for label, prefixes in (("полный", ()), ("облегченный", ("/api/",))):
+            with override_settings(LEAN_MIDDLEWARE_PREFIXES=prefixes):
+                start = time.process_time()
+                for _ in range(options["iterations"]):
+                    client.get(options["path"])
+                results[label] = (time.process_time() - start) / options["iterations"]
+            self.stdout.write(
+                f"{label:<12} {results[label] * 1e6:8.1f} мкс CPU на запрос"
+            )
+
+        saved = results["полный"] - results["облегченный"]
+        self.stdout.write(
+            f"Экономия: {saved * 1e6:.1f} мкс на запрос "
+            f"({saved / results['полный'] * 100:.1f}%)"
+        )
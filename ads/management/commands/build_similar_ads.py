@@ -0,0 +1,23 @@
+# ads/management/commands/build_similar_ads.py
+from django.core.management.base import BaseCommand
+
+from ads import similarity
+
+
+class Command(BaseCommand):
+    help = "Рассчитывает похожие объявления (полностью или только для новых)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Только объявления без рассчитанных соседей (для частого запуска)",
+        )
+        parser.add_argument("--block-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["incremental"]:
+            total = similarity.update_new(block_size=options["block_size"])
+        else:
+            total = similarity.rebuild(block_size=options["block_size"])
+        self.stdout.write(f"Обработано объявлений: {total}")
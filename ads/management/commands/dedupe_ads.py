@@ -0,0 +1,28 @@
+# ads/management/commands/dedupe_ads.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ads import fingerprint
+
+
+class Command(BaseCommand):
+    help = "Ищет почти одинаковые объявления в каталоге и помечает или удаляет дубли"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Пересчитать отпечатки всех объявлений",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Мягко удалить дубли (остается самое раннее объявление)",
+        )
+
+    def handle(self, *args, **options):
+        checked, duplicates = fingerprint.dedupe(
+            options["batch_size"], rebuild=options["rebuild"], delete=options["delete"]
+        )
+        self.stdout.write(f"Проверено объявлений: {checked}, дублей: {duplicates}")
@@ -0,0 +1,33 @@
+# ads/management/commands/expire_ads.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ads.caching import invalidate_counts_for_authors
+from ads.models import Ad, AdStatus
+
+
+class Command(BaseCommand):
+    help = "Переводит просроченные активные объявления в статус expired"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        queryset = Ad.all_objects.filter(status=AdStatus.ACTIVE, expires_at__lte=now)
+        total = 0
+        # Пачками, чтобы не держать блокировку на всей таблице
+        while True:
+            batch = list(
+                queryset.order_by().values_list("pk", "author_id")[
+                    : options["batch_size"]
+                ]
+            )
+            if not batch:
+                break
+            total += Ad.all_objects.filter(pk__in=[pk for pk, _ in batch]).update(
+                status=AdStatus.EXPIRED
+            )
+            invalidate_counts_for_authors(author_id for _, author_id in batch)
+        self.stdout.write(f"Истекло объявлений: {total}")
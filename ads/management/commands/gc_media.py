@@ -0,0 +1,37 @@
+# ads/management/commands/gc_media.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ads import mediagc
+
+
+class Command(BaseCommand):
+    help = "Удаляет из MEDIA_ROOT файлы, на которые не ссылается база"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=settings.MEDIA_GC_GRACE_HOURS,
+            help="Не трогать файлы моложе этого срока",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать, что будет удалено",
+        )
+
+    def handle(self, *args, **options):
+        def report(name, size):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{name}\t{size}")
+
+        deleted, freed = mediagc.collect_garbage(
+            options["grace_hours"],
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+            report=report,
+        )
+        verb = "Будет удалено" if options["dry_run"] else "Удалено"
+        self.stdout.write(f"{verb} файлов: {deleted}, байт: {freed}")
@@ -0,0 +1,126 @@
+# ads/management/commands/importtime.py
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Скрипт холодного старта: выполняется в отдельном интерпретаторе под
+# -X importtime, чтобы ни один модуль не был импортирован заранее.
+# Запрос к WSGI-приложению идет напрямую, без тестового клиента: он сам
+# тянет лишние модули и исказил бы профиль.
+STARTUP_SCRIPT = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": "localhost"}
+setup_testing_defaults(environ)
+status = []
+response = application(environ, lambda s, h, exc_info=None: status.append(s))
+b"".join(response)
+response.close()
+finished = time.perf_counter()
+
+print(json.dumps({
+    "setup": setup_done - started,
+    "first_request": finished - setup_done,
+    "status": status[0] if status else "",
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Разбирает вывод -X importtime: [(модуль, собственное, суммарное, глубина)].
+
+    Время в микросекундах; глубина — уровень вложенности импорта.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # заголовок таблицы
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Профиль холодного старта: время импорта по модулям и время до ответа "
+        "на первый запрос в свежем интерпретаторе"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--sort",
+            choices=("cumulative", "self"),
+            default="cumulative",
+            help="cumulative — вместе с вложенными импортами, self — только сам модуль",
+        )
+        parser.add_argument(
+            "--path",
+            default="/api/ads/",
+            help="Первый запрос после старта",
+        )
+        parser.add_argument(
+            "--packages",
+            action="store_true",
+            help="Сгруппировать время по пакетам верхнего уровня",
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT, options["path"]],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        rows = parse_importtime(result.stderr)
+        total = sum(own for _, own, _, _ in rows)
+
+        self.stdout.write(
+            f"django.setup(): {timings['setup'] * 1000:.0f} мс, "
+            f"первый запрос {options['path']}: "
+            f"{timings['first_request'] * 1000:.0f} мс ({timings['status']})"
+        )
+        self.stdout.write(
+            f"Импортировано модулей: {len(rows)}, время импорта: {total / 1000:.0f} мс"
+        )
+
+        if options["packages"]:
+            packages = {}
+            for name, own, _, _ in rows:
+                package = name.split(".")[0]
+                packages[package] = packages.get(package, 0) + own
+            ranked = sorted(packages.items(), key=lambda item: -item[1])
+            for package, own in ranked[: options["top"]]:
+                self.stdout.write(f"{own / 1000:9.1f} мс  {package}")
+            return
+
+        column = 1 if options["sort"] == "self" else 2
+        ranked = sorted(rows, key=lambda row: -row[column])
+        self.stdout.write(f"{'собств., мс':>12} {'всего, мс':>10}  модуль")
+        for name, own, cumulative, depth in ranked[: options["top"]]:
+            self.stdout.write(
+                f"{own / 1000:12.1f} {cumulative / 1000:10.1f}  {'  ' * depth}{name}"
+            )
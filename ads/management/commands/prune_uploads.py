@@ -0,0 +1,11 @@
+# ads/management/commands/prune_uploads.py
+from django.core.management.base import BaseCommand
+
+from ads import uploads
+
+
+class Command(BaseCommand):
+    help = "Удаляет брошенные загрузки по частям и их недокачанные файлы"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Удалено загрузок: {uploads.prune()}")
@@ -0,0 +1,25 @@
+# ads/management/commands/purge_deleted.py
+from django.core.management.base import BaseCommand
+
+from ads.purge import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Фоновое удаление пользователей и объявлений, помеченных удаленными"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--limit", type=int, default=100, help="Заданий за запуск")
+
+    def handle(self, *args, **options):
+        # Брошенные RUNNING тоже подхватываются после истечения аренды:
+        # прерванные задания безопасно продолжить
+        for _ in range(options["limit"]):
+            job = claim_job()
+            if job is None:
+                break
+            if not run_job(job, batch_size=options["batch_size"]):
+                self.stdout.write(f"{job}: перехвачено другим запуском")
+                continue
+            job.refresh_from_db()
+            self.stdout.write(f"{job}: удалено строк {job.deleted_rows}")
@@ -0,0 +1,30 @@
+# ads/management/commands/run_jobs.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ads import jobs
+
+
+class Command(BaseCommand):
+    help = "Воркер очереди фоновых заданий (уведомления и пр.)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.JOBS_BATCH_SIZE)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать созревшие задания и выйти (для cron)",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            count = jobs.run_once(options["batch_size"])
+            total += count
+            if not count:
+                if options["once"]:
+                    break
+                time.sleep(settings.JOBS_POLL_INTERVAL)
+        self.stdout.write(f"Обработано заданий: {total}")
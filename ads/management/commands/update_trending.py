@@ -0,0 +1,12 @@
+# ads/management/commands/update_trending.py
+from django.core.management.base import BaseCommand
+
+from ads import trending
+
+
+class Command(BaseCommand):
+    help = "Обновляет рейтинг популярности по новым комментариям (запускать раз в несколько минут)"
+
+    def handle(self, *args, **options):
+        processed = trending.update()
+        self.stdout.write(f"Учтено комментариев: {processed}")
@@ -0,0 +1,154 @@
+# ads/media.py
+"""Отдача медиафайлов с проверкой доступа.
+
+Django только проверяет права, а байты отдает nginx: ответ содержит
+X-Accel-Redirect на internal-location (MEDIA_ACCEL_REDIRECT), и nginx сам
+обрабатывает Range и кеширование. Без прокси файл отдается FileResponse,
+а запрос одного диапазона байт обслуживается здесь же. Без копирования
+через os.sendfile файл уходит только под WSGI-сервером с
+wsgi.file_wrapper; под ASGI (UvicornWorker из Dockerfile) file_wrapper
+нет, и Django читает файл кусками в Python. Поэтому в развертывании
+включайте MEDIA_ACCEL_REDIRECT за nginx (nginx.conf).
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .storage import PREFIX as CAS_PREFIX
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_user(request):
+    """Пользователь по сессии или по JWT из заголовка Authorization."""
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def can_access(request, name):
+    """Точка расширения для правил доступа к файлам."""
+    if name.startswith(tuple(settings.MEDIA_PROTECTED_PREFIXES)):
+        return get_user(request) is not None
+    return True
+
+
+class FileRange:
+    """Окно [start, start + length) файла. fileno() оставлен для
+    wsgi.file_wrapper: под WSGI окно уходит через sendfile, под ASGI
+    читается через read()."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) включительно для одного диапазона или None."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N — последние N байт
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+@require_safe
+def serve_media(request, name):
+    name = posixpath.normpath(name).lstrip("/")
+    try:
+        path = default_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not can_access(request, name):
+        # Не раскрываем, существует ли файл
+        raise Http404
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type or "application/octet-stream"
+    headers = {"Last-Modified": http_date(stat.st_mtime), "Accept-Ranges": "bytes"}
+    if name.startswith(CAS_PREFIX):
+        # Имя по хешу содержимого: по одному URL всегда одни и те же байты
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    if not was_modified_since(
+        request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime
+    ):
+        return HttpResponseNotModified(headers=headers)
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(name)
+        return response
+
+    file = open(path, "rb")
+    try:
+        byte_range = parse_range(request.headers.get("Range", ""), stat.st_size)
+    except ValueError:
+        file.close()
+        return HttpResponse(
+            status=416, headers={"Content-Range": f"bytes */{stat.st_size}"}
+        )
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+            headers=headers,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = end - start + 1
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
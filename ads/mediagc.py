@@ -0,0 +1,169 @@
+# ads/mediagc.py
+"""Сборка мусора в MEDIA_ROOT.
+
+Имена файлов, на которые ссылается база (все FileField всех моделей,
+включая архив), потоком складываются во временную SQLite-базу на диске —
+компактное множество с индексом. Затем дерево MEDIA_ROOT обходится через
+os.scandir без рекурсии, и файлы проверяются по множеству пачками.
+Память не зависит ни от числа строк, ни от числа файлов.
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from .models import ArchivedAd, MediaBlob
+
+# Имена файлов в обычных текстовых полях
+EXTRA_FIELDS = ((ArchivedAd, "image"), (ArchivedAd, "cover"))
+
+
+def file_fields():
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+    for model, name in EXTRA_FIELDS:
+        yield model, model._meta.get_field(name)
+
+
+class ReferenceSet:
+    """Множество строк во временном файле SQLite."""
+
+    def __init__(self, directory=None):
+        self._dir = tempfile.TemporaryDirectory(dir=directory)
+        self._db = sqlite3.connect(os.path.join(self._dir.name, "refs.sqlite3"))
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE refs (name TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add_many(self, names):
+        self._db.executemany(
+            "INSERT OR IGNORE INTO refs VALUES (?)", ((name,) for name in names)
+        )
+
+    def contains_many(self, names):
+        """Подмножество names, которое есть в множестве."""
+        found = set()
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(names), 500):
+            chunk = names[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                row[0]
+                for row in self._db.execute(
+                    f"SELECT name FROM refs WHERE name IN ({placeholders})", chunk
+                )
+            )
+        return found
+
+    def __len__(self):
+        return self._db.execute("SELECT count(*) FROM refs").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+        self._dir.cleanup()
+
+
+def collect_references(refs, batch_size):
+    for model, field in file_fields():
+        names = (
+            model._base_manager.exclude(**{field.name: ""})
+            .exclude(**{f"{field.name}__isnull": True})
+            .values_list(field.name, flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+        batch = []
+        for name in names:
+            batch.append(name)
+            if len(batch) >= batch_size:
+                refs.add_many(batch)
+                batch = []
+        refs.add_many(batch)
+
+
+def referenced(names):
+    """Подмножество names, на которое ссылается база прямо сейчас."""
+    found = set()
+    for model, field in file_fields():
+        found.update(
+            model._base_manager.filter(**{f"{field.name}__in": names}).values_list(
+                field.name, flat=True
+            )
+        )
+    return found
+
+
+def walk(root):
+    """(имя относительно root, DirEntry) для всех файлов дерева."""
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                name = f"{relative}/{entry.name}" if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    yield name, entry
+
+
+def collect_garbage(grace_hours, dry_run=False, batch_size=1000, report=None):
+    """Удаляет файлы без ссылок старше grace_hours; возвращает (число, байты)."""
+    root = str(settings.MEDIA_ROOT)
+    if not os.path.isdir(root):
+        return 0, 0
+    cutoff = time.time() - grace_hours * 3600
+    refs = ReferenceSet()
+    try:
+        collect_references(refs, batch_size)
+        deleted = freed = 0
+        batch = []
+
+        def flush():
+            nonlocal deleted, freed
+            known = refs.contains_many([name for name, _ in batch])
+            garbage = [name for name, _ in batch if name not in known]
+            # Снимок ссылок мог устареть за время обхода: кандидаты
+            # перепроверяются по базе непосредственно перед удалением
+            if garbage:
+                garbage = set(garbage) - referenced(garbage)
+            removed = []
+            for name, size in batch:
+                if name not in garbage:
+                    continue
+                path = os.path.join(root, name)
+                if not dry_run:
+                    try:
+                        # Повторная запись того же содержимого обновляет mtime
+                        if os.stat(path).st_mtime > cutoff:
+                            continue
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                if report:
+                    report(name, size)
+                removed.append(name)
+                deleted += 1
+                freed += size
+            if removed and not dry_run:
+                MediaBlob.objects.filter(name__in=removed).delete()
+            batch.clear()
+
+        for name, entry in walk(root):
+            stat = entry.stat(follow_symlinks=False)
+            # Свежие файлы могут принадлежать еще не зафиксированной транзакции
+            if stat.st_mtime > cutoff:
+                continue
+            batch.append((name, stat.st_size))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+        return deleted, freed
+    finally:
+        refs.close()
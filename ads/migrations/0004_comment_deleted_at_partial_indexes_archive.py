@@ -0,0 +1,60 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0003_soft_delete_and_purge_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedAd",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=200)),
+                ("price", models.PositiveIntegerField()),
+                ("description", models.TextField()),
+                ("author_id", models.BigIntegerField(db_index=True)),
+                ("created_at", models.DateTimeField()),
+                ("image", models.CharField(blank=True, max_length=100)),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("text", models.TextField()),
+                ("author_id", models.BigIntegerField(db_index=True)),
+                ("ad_id", models.BigIntegerField(db_index=True)),
+                ("created_at", models.DateTimeField()),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["-created_at"],
+                name="ad_live_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["ad", "-created_at"],
+                name="comment_live_ad_idx",
+            ),
+        ),
+    ]
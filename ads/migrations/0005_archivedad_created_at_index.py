@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0004_comment_deleted_at_partial_indexes_archive"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedad",
+            name="created_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:07
+
+import ads.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0005_archivedad_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ad",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True, default=ads.models.default_expires_at, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("active", "Active"),
+                    ("sold", "Sold"),
+                    ("expired", "Expired"),
+                ],
+                default="active",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True), ("status", "active")),
+                fields=["-created_at"],
+                name="ad_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["expires_at"],
+                name="ad_active_expires_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0006_ad_status_expires_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["author", "-created_at"],
+                include=("title", "price", "status", "expires_at", "image"),
+                name="ad_author_created_idx",
+            ),
+        ),
+    ]
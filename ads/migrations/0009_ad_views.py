@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0008_ad_location_geohash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ad",
+            name="views",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
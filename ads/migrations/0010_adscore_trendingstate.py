@@ -0,0 +1,51 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0009_ad_views"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_comment_id", models.BigIntegerField(default=0)),
+                ("epoch", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AdScore",
+            fields=[
+                (
+                    "ad",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score",
+                        serialize=False,
+                        to="ads.ad",
+                    ),
+                ),
+                ("score", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["-score"], name="adscore_score_idx")],
+            },
+        ),
+    ]
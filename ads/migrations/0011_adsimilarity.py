@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0010_adscore_trendingstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdSimilarity",
+            fields=[
+                (
+                    "ad",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="similarity",
+                        serialize=False,
+                        to="ads.ad",
+                    ),
+                ),
+                ("neighbours", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
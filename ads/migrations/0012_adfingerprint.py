@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0011_adsimilarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdFingerprint",
+            fields=[
+                (
+                    "ad",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="fingerprint",
+                        serialize=False,
+                        to="ads.ad",
+                    ),
+                ),
+                ("text_hash", models.BigIntegerField()),
+                ("image_hash", models.BigIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "duplicate_of",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="ads.ad",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AdFingerprintBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.BigIntegerField(db_index=True)),
+                (
+                    "fingerprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="ads.adfingerprint",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.27 on 2026-10-19 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0014_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ad",
+            name="cover",
+            field=models.ImageField(blank=True, editable=False, upload_to=""),
+        ),
+        migrations.CreateModel(
+            name="AdImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("image", models.ImageField(upload_to="ads/gallery/")),
+                ("thumbnail", models.ImageField(upload_to="ads/thumbs/")),
+                ("position", models.PositiveSmallIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "ad",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="images",
+                        to="ads.ad",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["position", "pk"],
+                "indexes": [
+                    models.Index(fields=["ad", "position"], name="adimage_ad_pos_idx")
+                ],
+            },
+        ),
+    ]
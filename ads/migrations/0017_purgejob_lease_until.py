@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0016_mediablob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purgejob",
+            name="lease_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0017_purgejob_lease_until"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedad",
+            name="cover",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="geohash",
+            field=models.CharField(blank=True, max_length=12),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="status",
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name="archivedad",
+            name="views",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="is_hidden",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name="archivedcomment",
+            name="created_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+def mark_unscored(apps, schema_editor):
+    # Уже учтенные по старой отметке last_comment_id остаются scored=True,
+    # более новые попадут в следующий update_trending
+    TrendingState = apps.get_model("ads", "TrendingState")
+    Comment = apps.get_model("ads", "Comment")
+    state = TrendingState.objects.filter(pk=1).first()
+    last_comment_id = state.last_comment_id if state else 0
+    Comment.objects.filter(pk__gt=last_comment_id).update(scored=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0018_archive_all_columns"),
+    ]
+
+    operations = [
+        # Существующие строки получают True без перезаписи всей таблицы,
+        # новые — False
+        migrations.AddField(
+            model_name="comment",
+            name="scored",
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="scored",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_unscored, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="trendingstate",
+            name="last_comment_id",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("scored", False)),
+                fields=["id"],
+                name="comment_unscored_idx",
+            ),
+        ),
+    ]
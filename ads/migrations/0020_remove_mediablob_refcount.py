@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0019_comment_scored"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="mediablob",
+            name="refcount",
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0020_remove_mediablob_refcount"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="ad_author_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["author", "-created_at"],
+                include=("title", "price", "status", "expires_at", "image", "views"),
+                name="ad_author_created_idx",
+            ),
+        ),
+    ]
@@ -1,31 +1,450 @@
 # ads/models.py
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from users.models import User
+from . import geo
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def soft_delete(self):
+        return self.update(deleted_at=timezone.now())
+
+    def restore(self):
+        return self.update(deleted_at=None)
+
+
+class LiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Менеджер по умолчанию: только неудаленные строки."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """Мягкое удаление через deleted_at.
+
+    objects видит только живые строки (и используется для обратных связей,
+    например ad.comments), all_objects — все, включая удаленные.
+    """
+
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
 
+    def soft_delete(self):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=["deleted_at"])
 
-class Ad(models.Model):
+    def restore(self):
+        self.deleted_at = None
+        self.save(update_fields=["deleted_at"])
+
+
+class AdStatus(models.TextChoices):
+    DRAFT = "draft"
+    ACTIVE = "active"
+    SOLD = "sold"
+    EXPIRED = "expired"
+
+
+def default_expires_at():
+    return timezone.now() + timedelta(days=settings.ADS_LIFETIME_DAYS)
+
+
+class AdQuerySet(SoftDeleteQuerySet):
+    def active(self):
+        """Опубликованные и не истекшие объявления.
+
+        Условие по status совпадает с частичным индексом ad_active_created_idx;
+        проверка expires_at нужна только между запусками expire_ads.
+        """
+        return self.filter(status=AdStatus.ACTIVE).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+        )
+
+
+class Ad(SoftDeleteModel):
     title = models.CharField(max_length=200)
     price = models.PositiveIntegerField()
     description = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ads")
     created_at = models.DateTimeField(auto_now_add=True)
     image = models.ImageField(upload_to="ads/", null=True, blank=True)
+    status = models.CharField(
+        max_length=10, choices=AdStatus.choices, default=AdStatus.ACTIVE
+    )
+    expires_at = models.DateTimeField(null=True, blank=True, default=default_expires_at)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Обновляется пакетно из ads.counters, а не на каждый просмотр
+    views = models.PositiveBigIntegerField(default=0, editable=False)
+    # Миниатюра первой картинки галереи, для списков без JOIN (см. ads.gallery)
+    cover = models.ImageField(blank=True, editable=False)
+    # Заполняется в save() по координатам, см. ads.geo
+    geohash = models.CharField(max_length=geo.MAX_PRECISION, blank=True, editable=False)
+
+    objects = LiveManager.from_queryset(AdQuerySet)()
+    all_objects = models.Manager.from_queryset(AdQuerySet)()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Частичный индекс: удаленные строки не раздувают индекс ленты
+            models.Index(
+                fields=["-created_at"],
+                name="ad_live_created_idx",
+                condition=Q(deleted_at__isnull=True),
+            ),
+            # Лента активных объявлений сканирует только «живой» ассортимент
+            models.Index(
+                fields=["-created_at"],
+                name="ad_active_created_idx",
+                condition=Q(status="active", deleted_at__isnull=True),
+            ),
+            # Объявления автора: keyset по created_at; INCLUDE делает индекс
+            # покрывающим на PostgreSQL (на SQLite игнорируется)
+            models.Index(
+                fields=["author", "-created_at"],
+                name="ad_author_created_idx",
+                condition=Q(deleted_at__isnull=True),
+                include=["title", "price", "status", "expires_at", "image", "views"],
+            ),
+            # Поиск рядом: диапазоны по префиксу geohash среди активных
+            models.Index(
+                fields=["geohash"],
+                name="ad_active_geohash_idx",
+                condition=Q(status="active", deleted_at__isnull=True) & ~Q(geohash=""),
+            ),
+            # Для expire_ads
+            models.Index(
+                fields=["expires_at"],
+                name="ad_active_expires_idx",
+                condition=Q(status="active"),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
+
+class AdImage(models.Model):
+    """Картинка галереи объявления; миниатюра строится при загрузке."""
+
+    ad = models.ForeignKey(Ad, on_delete=models.CASCADE, related_name="images")
+    image = models.ImageField(upload_to="ads/gallery/")
+    thumbnail = models.ImageField(upload_to="ads/thumbs/")
+    position = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["position", "pk"]
+        indexes = [models.Index(fields=["ad", "position"], name="adimage_ad_pos_idx")]
+
+    def __str__(self):
+        return self.image.name
 
-class Comment(models.Model):
+
+class Comment(SoftDeleteModel):
     text = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     ad = models.ForeignKey(Ad, on_delete=models.CASCADE, related_name="comments")
     created_at = models.DateTimeField(auto_now_add=True)
+    is_hidden = models.BooleanField(default=False)
+    # Учтен ли в рейтинге trending (см. ads.trending.update)
+    scored = models.BooleanField(default=False, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["ad", "-created_at"],
+                name="comment_live_ad_idx",
+                condition=Q(deleted_at__isnull=True),
+            ),
+            # Очередь update_trending: в индексе только еще не учтенные
+            models.Index(
+                fields=["id"],
+                name="comment_unscored_idx",
+                condition=Q(scored=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.author.email} - {self.ad.title[:20]}"
+
+
+class PurgeJob(models.Model):
+    """Фоновое удаление объекта с большим числом зависимых строк.
+
+    Сам объект помечается удаленным сразу, а строки удаляются пачками
+    командой purge_deleted. deleted_rows показывает прогресс.
+    """
+
+    class Target(models.TextChoices):
+        USER = "user"
+        AD = "ad"
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    target = models.CharField(max_length=10, choices=Target.choices)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True
+    )
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # До какого момента задание принадлежит взявшему его запуску
+    lease_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"{self.target} #{self.object_id} ({self.status})"
+
+
+class Job(models.Model):
+    """Задание фоновой очереди (см. ads.jobs, команда run_jobs).
+
+    Выполненные задания удаляются, в таблице остаются ожидающие и
+    упавшие. key объединяет задания, которые обрабатываются вместе
+    (например, уведомления одному адресату).
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    kind = models.CharField(max_length=50)
+    key = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Кто и до какого момента держит задание; просроченное забирается снова
+    lock_token = models.CharField(max_length=32, blank=True, db_index=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["run_after"],
+                name="job_pending_idx",
+                condition=Q(status="pending"),
+            ),
+            models.Index(
+                fields=["key"],
+                name="job_pending_key_idx",
+                condition=Q(status="pending"),
+            ),
+            models.Index(
+                fields=["locked_until"],
+                name="job_running_idx",
+                condition=Q(status="running"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ChunkedUpload(models.Model):
+    """Загрузка файла по частям с возможностью продолжить (см. ads.uploads).
+
+    Части дописываются в файл path() строго по порядку, offset — сколько
+    байт уже принято и проверено.
+    """
+
+    class Status(models.TextChoices):
+        UPLOADING = "uploading"
+        COMPLETE = "complete"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="uploads")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.UPLOADING
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.pk}.part")
+
+
+class MediaBlob(models.Model):
+    """Файл контентно-адресуемого хранилища (см. ads.storage).
+
+    Счетчика ссылок нет: строки удаляются и копируются в архив в обход
+    сигналов (_raw_delete, bulk_create), и счетчик бы расходился с базой.
+    Ссылки gc_media каждый раз собирает по FileField всех моделей.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ArchivedAd(models.Model):
+    """Холодное хранилище объявлений, вынесенных из основной таблицы.
+
+    Связи хранятся как простые числа: автор к этому моменту может быть
+    уже удален.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    price = models.PositiveIntegerField()
+    description = models.TextField()
+    author_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(db_index=True)
+    image = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=10, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=geo.MAX_PRECISION, blank=True)
+    views = models.PositiveBigIntegerField(default=0)
+    cover = models.CharField(max_length=100, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField()
+    author_id = models.BigIntegerField(db_index=True)
+    ad_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(db_index=True)
+    is_hidden = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.text[:20]
+
+
+class AdScore(models.Model):
+    """Предрассчитанная популярность объявления для ленты trending.
+
+    Вклад события в момент t хранится как w * 2^((t - epoch) / half_life),
+    поэтому порядок по score совпадает с порядком по затухающей
+    популярности и старые строки не нужно пересчитывать (см. ads.trending).
+    """
+
+    ad = models.OneToOneField(
+        Ad, on_delete=models.CASCADE, primary_key=True, related_name="score"
+    )
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["-score"], name="adscore_score_idx")]
+
+    def __str__(self):
+        return f"{self.ad_id}: {self.score}"
+
+
+class TrendingState(models.Model):
+    """Состояние инкрементального пересчета (единственная строка)."""
+
+    epoch = models.DateTimeField(default=timezone.now)
+
+
+class AdSimilarity(models.Model):
+    """Рассчитанные похожие объявления: [[ad_id, score], ...] по убыванию.
+
+    Заполняется командой build_similar_ads (см. ads.similarity).
+    """
+
+    ad = models.OneToOneField(
+        Ad, on_delete=models.CASCADE, primary_key=True, related_name="similarity"
+    )
+    neighbours = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.ad_id}: {len(self.neighbours)}"
+
+
+class AdFingerprint(models.Model):
+    """Отпечатки содержимого объявления для поиска дублей (см. ads.fingerprint).
+
+    text_hash — SimHash заголовка и описания, image_hash — dHash картинки;
+    оба 64-битные, хранятся со знаком.
+    """
+
+    ad = models.OneToOneField(
+        Ad, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint"
+    )
+    text_hash = models.BigIntegerField()
+    image_hash = models.BigIntegerField(null=True, blank=True)
+    # Найденный при проверке оригинал (политика flag или dedupe_ads)
+    duplicate_of = models.ForeignKey(
+        Ad, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.ad_id}: {self.text_hash:x}"
+
+
+class AdFingerprintBand(models.Model):
+    """LSH-индекс: отрезки отпечатков; близкие отпечатки совпадают хоть в одном."""
+
+    fingerprint = models.ForeignKey(
+        AdFingerprint, on_delete=models.CASCADE, related_name="bands"
+    )
+    key = models.BigIntegerField(db_index=True)
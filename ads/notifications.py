@@ -0,0 +1,41 @@
+# ads/notifications.py
+"""Уведомления авторов объявлений о новых комментариях."""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+
+from .models import Comment
+
+
+def send_comment_digests(jobs):
+    """Задания comment_notification → одно письмо на автора объявления.
+
+    Скрытые и удаленные к моменту отправки комментарии, а также комментарии
+    автора к своим объявлениям пропускаются.
+    """
+    comment_ids = [job.payload["comment_id"] for job in jobs]
+    comments = (
+        Comment.objects.filter(pk__in=comment_ids, is_hidden=False)
+        .select_related("ad__author")
+        .order_by("pk")
+    )
+    by_recipient = defaultdict(list)
+    for comment in comments:
+        if comment.author_id != comment.ad.author_id:
+            by_recipient[comment.ad.author].append(comment)
+
+    messages = []
+    for recipient, items in by_recipient.items():
+        lines = [f"«{comment.ad.title}»: {comment.text}" for comment in items]
+        messages.append(
+            (
+                f"Новые комментарии к вашим объявлениям: {len(items)}",
+                "\n\n".join(lines),
+                settings.DEFAULT_FROM_EMAIL,
+                [recipient.email],
+            )
+        )
+    # Одно соединение с почтовым сервером на всю пачку
+    send_mass_mail(messages, fail_silently=False)
@@ -0,0 +1,21 @@
+# ads/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class AuthorAdsPagination(CursorPagination):
+    """Keyset-пагинация по индексу (author_id, created_at DESC).
+
+    Глубина страницы не влияет на стоимость запроса, в отличие от OFFSET.
+    """
+
+    ordering = "-created_at"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        count = getattr(self, "count", None)
+        if count is not None:
+            response.data["count"] = count
+        return response
@@ -13,3 +13,12 @@ class IsAuthorOrAdmin(permissions.BasePermission):
             or request.user.is_superuser
             or request.user.role == "admin"
         )
+
+
+class IsAdmin(permissions.BasePermission):
+    """Доступ только администраторам (User.is_admin)."""
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated and request.user.is_admin
+        )
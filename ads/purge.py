@@ -0,0 +1,177 @@
+# ads/purge.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.models import User
+from .caching import invalidate_author_counts
+from .models import Ad, PurgeJob
+
+TARGET_MODELS = {
+    PurgeJob.Target.USER: User,
+    PurgeJob.Target.AD: Ad,
+}
+
+
+def schedule_ad_deletion(ad):
+    """Скрывает объявление и ставит окончательное удаление в очередь,
+    минуя архив (например, по требованию правообладателя)."""
+    with transaction.atomic():
+        Ad.all_objects.filter(pk=ad.pk).update(deleted_at=timezone.now())
+        job = PurgeJob.objects.create(target=PurgeJob.Target.AD, object_id=ad.pk)
+    invalidate_author_counts(ad.author_id)
+    return job
+
+
+def schedule_user_deletion(user):
+    """Деактивирует пользователя, скрывает его объявления и комментарии."""
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        user.ads.soft_delete()
+        user.comments.soft_delete()
+        job = PurgeJob.objects.create(target=PurgeJob.Target.USER, object_id=user.pk)
+    invalidate_author_counts(user.pk)
+    return job
+
+
+class LeaseLost(Exception):
+    """Аренда задания истекла, и его забрал другой запуск."""
+
+
+def _claimable(now):
+    # Ожидающие и брошенные: RUNNING с истекшей арендой
+    return Q(status=PurgeJob.Status.PENDING) | Q(
+        Q(lease_until__isnull=True) | Q(lease_until__lt=now),
+        status=PurgeJob.Status.RUNNING,
+    )
+
+
+def _new_lease():
+    return timezone.now() + timedelta(seconds=settings.PURGE_LEASE_SECONDS)
+
+
+def claim_job(pk=None):
+    """Берет задание в работу на PURGE_LEASE_SECONDS. None — брать нечего.
+
+    На PostgreSQL параллельные запуски расходятся по разным строкам через
+    SKIP LOCKED; условный UPDATE нужен для SQLite, где select_for_update
+    ничего не блокирует.
+    """
+    now = timezone.now()
+    lease_until = _new_lease()
+    with transaction.atomic():
+        queryset = PurgeJob.objects.select_for_update(skip_locked=True).filter(
+            _claimable(now)
+        )
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        job = queryset.order_by("created_at").first()
+        if job is None:
+            return None
+        claimed = PurgeJob.objects.filter(_claimable(now), pk=job.pk).update(
+            status=PurgeJob.Status.RUNNING, lease_until=lease_until
+        )
+    if not claimed:
+        return None
+    job.status = PurgeJob.Status.RUNNING
+    job.lease_until = lease_until
+    return job
+
+
+def run_job(job, batch_size=None):
+    """Выполняет задание. Каждая пачка коммитится отдельно, поэтому
+    прерванное задание можно просто запустить повторно.
+
+    Задание, не взятое через claim_job, сначала берется в работу. Все
+    записи о ходе выполнения идут с проверкой аренды; если ее перехватили,
+    возвращает False и больше ничего не пишет.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    if job.lease_until is None:
+        job = claim_job(pk=job.pk)
+        if job is None:
+            return False
+    model = TARGET_MODELS[job.target]
+
+    def update(**fields):
+        updated = PurgeJob.objects.filter(
+            pk=job.pk, lease_until=job.lease_until
+        ).update(**fields)
+        if not updated:
+            raise LeaseLost(job.pk)
+
+    def progress(count):
+        lease_until = _new_lease()
+        update(deleted_rows=F("deleted_rows") + count, lease_until=lease_until)
+        job.lease_until = lease_until
+
+    try:
+        _purge_dependents(model, [job.object_id], batch_size, progress)
+        # Зависимые строки уже удалены, коллектору остается сам объект
+        # (и мелкие служебные связи вроде групп пользователя)
+        with transaction.atomic():
+            deleted, _ = model._base_manager.filter(pk=job.object_id).delete()
+        progress(deleted)
+        update(status=PurgeJob.Status.DONE, finished_at=timezone.now())
+    except LeaseLost:
+        return False
+    except Exception as exc:
+        update(
+            status=PurgeJob.Status.FAILED, error=str(exc), finished_at=timezone.now()
+        )
+        raise
+    return True
+
+
+def _reverse_relations(model):
+    """Обратные связи model, включая скрытые (related_name="+"): их нет в
+    _meta.related_objects, а _raw_delete без них нарушил бы внешний ключ."""
+    return [
+        field
+        for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and field.is_relation
+    ]
+
+
+def _purge_dependents(model, pks, batch_size, progress):
+    """Удаляет строки, ссылающиеся на model с первичными ключами pks.
+
+    Обходит обратные связи рекурсивно, снизу вверх, выбирая не больше
+    batch_size ключей за раз: память не зависит от числа строк, а сигналы
+    и загрузка объектов коллектором не используются.
+    """
+    for rel in _reverse_relations(model):
+        if rel.many_to_many or rel.on_delete is models.DO_NOTHING:
+            continue
+        related_model = rel.related_model
+        lookup = {f"{rel.field.name}__in": pks}
+
+        if rel.on_delete is models.SET_NULL:
+            related_model._base_manager.filter(**lookup).update(
+                **{rel.field.name: None}
+            )
+            continue
+        if rel.on_delete is not models.CASCADE:
+            raise ValueError(
+                f"Неподдерживаемая связь {related_model.__name__}.{rel.field.name}"
+            )
+
+        while True:
+            batch = list(
+                related_model._base_manager.filter(**lookup)
+                .order_by()
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            _purge_dependents(related_model, batch, batch_size, progress)
+            with transaction.atomic():
+                queryset = related_model._base_manager.filter(pk__in=batch)
+                if related_model._meta.many_to_many:
+                    deleted, _ = queryset.delete()
+                else:
+                    deleted = queryset._raw_delete(queryset.db)
+            progress(deleted)
@@ -1,6 +1,18 @@
 # ads/serializers.py
 from rest_framework import serializers
-from .models import Ad, Comment
+from . import counters
+from django.conf import settings
+from django.core.files import File
+from django.core.validators import validate_image_file_extension
+from .models import (
+    Ad,
+    AdImage,
+    AdStatus,
+    ChunkedUpload,
+    Comment,
+    PurgeJob,
+    default_expires_at,
+)
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -10,8 +22,25 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ("author", "ad", "created_at")
 
 
-class AdSerializer(serializers.ModelSerializer):
+class AdImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AdImage
+        fields = ("id", "image", "thumbnail", "position")
+        read_only_fields = ("image", "thumbnail")
+
+
+class ViewCountMixin(serializers.Serializer):
+    # Значение из БД плюс еще не записанные просмотры, без лишних запросов
+    views = serializers.SerializerMethodField()
+
+    def get_views(self, obj) -> int:
+        return obj.views + counters.pending(obj.pk)
+
+
+class AdSerializer(ViewCountMixin, serializers.ModelSerializer):
     comments = CommentSerializer(many=True, read_only=True)
+    # Есть только в выдаче с ?near=, в километрах
+    distance = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Ad
@@ -22,7 +51,146 @@ class AdSerializer(serializers.ModelSerializer):
             "description",
             "author",
             "image",
+            "cover",
+            "status",
+            "expires_at",
+            "latitude",
+            "longitude",
+            "distance",
+            "views",
             "created_at",
             "comments",
         )
-        read_only_fields = ("author", "created_at", "comments")
+        read_only_fields = ("author", "expires_at", "created_at", "comments")
+
+    def validate(self, attrs):
+        latitude = attrs.get("latitude", getattr(self.instance, "latitude", None))
+        longitude = attrs.get("longitude", getattr(self.instance, "longitude", None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError("Широта и долгота указываются вместе.")
+        return attrs
+
+    def update(self, instance, validated_data):
+        # Повторная публикация продлевает срок объявления
+        if (
+            validated_data.get("status") == AdStatus.ACTIVE
+            and instance.status != AdStatus.ACTIVE
+        ):
+            validated_data["expires_at"] = default_expires_at()
+        return super().update(instance, validated_data)
+
+
+class AdDetailSerializer(AdSerializer):
+    """Объявление с полной галереей — для страницы объявления."""
+
+    images = AdImageSerializer(many=True, read_only=True)
+
+    class Meta(AdSerializer.Meta):
+        fields = AdSerializer.Meta.fields + ("images",)
+
+
+class AdImageUploadSerializer(serializers.Serializer):
+    images = serializers.ListField(
+        child=serializers.FileField(validators=[validate_image_file_extension]),
+        allow_empty=False,
+        max_length=20,
+    )
+
+
+class AdShortSerializer(ViewCountMixin, serializers.ModelSerializer):
+    """Объявление без описания и комментариев — для списков автора."""
+
+    class Meta:
+        model = Ad
+        fields = (
+            "id",
+            "title",
+            "price",
+            "image",
+            "status",
+            "expires_at",
+            "views",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
+class CommentModerationSerializer(serializers.Serializer):
+    """Выборка комментариев для массовой модерации.
+
+    Заданные условия объединяются через AND; хотя бы одно обязательно.
+    """
+
+    ACTIONS = ("delete", "hide", "unhide")
+
+    action = serializers.ChoiceField(choices=ACTIONS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    author = serializers.IntegerField(required=False)
+    ad = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if not any(key in attrs for key in ("ids", "author", "ad")):
+            raise serializers.ValidationError("Укажите ids, author или ad.")
+        return attrs
+
+
+class CommentImportSerializer(serializers.Serializer):
+    ad = serializers.IntegerField()
+    text = serializers.CharField()
+    author = serializers.IntegerField(required=False)
+
+
+class PurgeJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PurgeJob
+        fields = (
+            "id",
+            "target",
+            "object_id",
+            "status",
+            "deleted_rows",
+            "error",
+            "created_at",
+            "finished_at",
+        )
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = (
+            "id",
+            "filename",
+            "size",
+            "sha256",
+            "offset",
+            "chunk_size",
+            "status",
+            "created_at",
+        )
+        read_only_fields = ("offset", "status", "created_at")
+
+    def get_chunk_size(self, obj) -> int:
+        return settings.CHUNKED_UPLOAD_CHUNK_SIZE
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Недопустимый размер файла.")
+        return value
+
+    def validate_filename(self, value):
+        validate_image_file_extension(File(None, value))
+        return value
+
+    def validate_sha256(self, value):
+        if value and len(value) != 64:
+            raise serializers.ValidationError("Ожидается SHA-256 в hex.")
+        return value
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    ad = serializers.IntegerField()
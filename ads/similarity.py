@@ -0,0 +1,191 @@
+# ads/similarity.py
+"""Похожие объявления по тексту (title + description).
+
+Тексты превращаются в хешированные векторы слов и символьных триграмм
+(без словаря, поэтому новые объявления векторизуются независимо от
+корпуса), ближайшие соседи ищутся пакетными произведениями разреженных
+матриц. Результат хранится в AdSimilarity и отдается по первичному ключу.
+
+Требует numpy и scipy; модуль используется только командой
+build_similar_ads, API его не импортирует.
+"""
+
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Ad, AdSimilarity
+
+N_FEATURES = 2**18
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _features(text):
+    for word in TOKEN_RE.findall(text.lower()):
+        yield word
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            yield padded[i : i + 3]
+
+
+def vectorize(texts):
+    """Строки -> CSR-матрица с сублинейным TF и L2-нормировкой строк."""
+    indptr = [0]
+    indices = []
+    for text in texts:
+        indices.extend(
+            zlib.crc32(feature.encode()) % N_FEATURES for feature in _features(text)
+        )
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices, indptr),
+        shape=(len(texts), N_FEATURES),
+    )
+    matrix.sum_duplicates()
+    np.log1p(matrix.data, out=matrix.data)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+def _text(title, description):
+    # Заголовок важнее описания
+    return f"{title} {title} {description}"
+
+
+def iter_corpus(queryset, chunk_size):
+    """Пачки (ids, matrix) по возрастанию первичного ключа (keyset)."""
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "title", "description")[:chunk_size]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        yield ids, vectorize([_text(title, desc) for _, title, desc in rows])
+
+
+def top_k(query_ids, query_matrix, corpus, k, on_chunk=None):
+    """Для каждой строки query_matrix — k ближайших строк корпуса.
+
+    corpus — итерируемое пачек (ids, matrix); в памяти одновременно только
+    плотная матрица len(query) x len(пачки). Возвращает (ids, scores)
+    формы (len(query), k), отсортированные по убыванию сходства.
+    """
+    n = len(query_ids)
+    best_ids = np.full((n, k), -1, dtype=np.int64)
+    best_scores = np.full((n, k), -1.0, dtype=np.float32)
+    for ids, matrix in corpus:
+        sims = (query_matrix @ matrix.T).toarray()
+        sims[query_ids[:, None] == ids[None, :]] = -1.0
+        if on_chunk is not None:
+            on_chunk(ids, sims)
+        merged_scores = np.hstack([best_scores, sims])
+        merged_ids = np.hstack([best_ids, np.broadcast_to(ids, sims.shape)])
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return (
+        np.take_along_axis(best_ids, order, axis=1),
+        np.take_along_axis(best_scores, order, axis=1),
+    )
+
+
+def _neighbours(ids, scores):
+    min_score = settings.SIMILAR_ADS_MIN_SCORE
+    return [
+        [int(pk), round(float(score), 4)]
+        for pk, score in zip(ids, scores)
+        if pk >= 0 and score >= min_score
+    ]
+
+
+def _save(rows):
+    AdSimilarity.objects.bulk_create(
+        [AdSimilarity(ad_id=pk, neighbours=neighbours) for pk, neighbours in rows],
+        update_conflicts=True,
+        unique_fields=["ad"],
+        update_fields=["neighbours", "updated_at"],
+    )
+
+
+def rebuild(block_size=None, k=None):
+    """Полный пересчет: корпус векторизуется один раз и держится в памяти."""
+    block_size = block_size or settings.SIMILAR_ADS_BLOCK_SIZE
+    k = k or settings.SIMILAR_ADS_K
+    chunks = list(iter_corpus(Ad.objects.active(), block_size))
+    total = 0
+    for query_ids, query_matrix in chunks:
+        ids, scores = top_k(query_ids, query_matrix, chunks, k)
+        with transaction.atomic():
+            _save(
+                (int(pk), _neighbours(ids[row], scores[row]))
+                for row, pk in enumerate(query_ids)
+            )
+        total += len(query_ids)
+    AdSimilarity.objects.exclude(ad__in=Ad.objects.active()).delete()
+    return total
+
+
+def update_new(block_size=None, k=None):
+    """Инкремент: соседи для объявлений без рассчитанной строки.
+
+    Корпус читается из БД одним проходом; попутно новые объявления
+    добавляются в списки соседей уже рассчитанных объявлений.
+    """
+    block_size = block_size or settings.SIMILAR_ADS_BLOCK_SIZE
+    k = k or settings.SIMILAR_ADS_K
+    new_ads = Ad.objects.active().filter(similarity__isnull=True)
+    total = 0
+    for query_ids, query_matrix in iter_corpus(new_ads, block_size):
+        candidates = {}
+
+        def collect(ids, sims):
+            # Лучший новый сосед для каждого объявления корпуса
+            best = sims.argmax(axis=0)
+            best_scores = sims[best, np.arange(len(ids))]
+            for col in np.nonzero(best_scores >= settings.SIMILAR_ADS_MIN_SCORE)[0]:
+                candidates[int(ids[col])] = (
+                    int(query_ids[best[col]]),
+                    float(best_scores[col]),
+                )
+
+        ids, scores = top_k(
+            query_ids,
+            query_matrix,
+            iter_corpus(Ad.objects.active(), block_size),
+            k,
+            on_chunk=collect,
+        )
+        with transaction.atomic():
+            _save(
+                (int(pk), _neighbours(ids[row], scores[row]))
+                for row, pk in enumerate(query_ids)
+            )
+            _merge_into_existing(candidates, k, exclude=set(query_ids.tolist()))
+        total += len(query_ids)
+    return total
+
+
+def _merge_into_existing(candidates, k, exclude):
+    updated = []
+    existing = AdSimilarity.objects.filter(ad_id__in=candidates).exclude(
+        ad_id__in=exclude
+    )
+    for similarity in existing:
+        new_pk, new_score = candidates[similarity.ad_id]
+        neighbours = [pair for pair in similarity.neighbours if pair[0] != new_pk]
+        neighbours.append([new_pk, round(new_score, 4)])
+        neighbours.sort(key=lambda pair: -pair[1])
+        similarity.neighbours = neighbours[:k]
+        updated.append(similarity)
+    AdSimilarity.objects.bulk_update(updated, ["neighbours"], batch_size=500)
@@ -0,0 +1,97 @@
+# ads/storage.py
+"""Контентно-адресуемое хранилище медиафайлов.
+
+Файл получает имя по SHA-256 содержимого: cas/ab/cd/abcd...ef.jpg.
+Одинаковые картинки хранятся один раз, а URL никогда не меняет смысл,
+поэтому nginx отдает /media/cas/ с Cache-Control: immutable на год.
+Файлы учитываются в MediaBlob; файлы, на которые не ссылается база,
+удаляет gc_media.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+from .models import MediaBlob
+
+PREFIX = "cas/"
+BLOCK_SIZE = 64 * 1024
+
+
+def blob_name(digest, ext):
+    return f"{PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while block := file.read(BLOCK_SIZE):
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя задает хеш содержимого в _save()
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+        spooled = None
+        if hasattr(content, "temporary_file_path"):
+            # Большая загрузка уже на диске: хешируем и перемещаем без копии
+            source = content.temporary_file_path()
+            digest, size = _hash_file(source)
+        else:
+            source, digest, size = self._spool(content)
+            spooled = source
+
+        name = blob_name(digest, ext)
+        full_path = self.path(name)
+        try:
+            try:
+                # Повторное содержимое: свежий mtime защищает файл от
+                # gc_media, пока ссылка на него еще не зафиксирована
+                os.utime(full_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                # Одновременная запись того же содержимого безопасна:
+                # файлы одинаковые, а замена атомарна
+                file_move_safe(source, full_path, allow_overwrite=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if not hasattr(content, "temporary_file_path") and os.path.exists(spooled):
+                os.remove(spooled)
+
+        MediaBlob.objects.get_or_create(name=name, defaults={"size": size})
+        return name
+
+    def _spool(self, content):
+        """Пишет content во временный файл рядом с хранилищем, считая хеш."""
+        directory = self.path(PREFIX + "tmp")
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+            if hasattr(content, "seek"):
+                content.seek(0)
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+        return file.name, digest.hexdigest(), size
+
+    def delete(self, name):
+        """Файлы cas/ не удаляются: на то же содержимое могут ссылаться другие
+        строки, а немедленное удаление гонялось бы с параллельной записью.
+        Их удалит gc_media, когда ссылок не останется."""
+        if not name.startswith(PREFIX):
+            super().delete(name)
@@ -0,0 +1,125 @@
+# ads/stream.py
+"""Рассылка новых комментариев подписчикам (Server-Sent Events).
+
+Подписчик — очередь asyncio в цикле событий ASGI-воркера, поэтому тысячи
+ожидающих соединений стоят лишь памяти под очереди. Публикация
+потокобезопасна: синхронные представления DRF работают в потоках и
+передают сообщение в цикл через call_soon_threadsafe.
+
+Брокер живет в процессе. Если задан COMMENT_STREAM_REDIS_URL (нужен пакет
+redis), публикация идет через Redis pub/sub, а фоновый поток каждого
+воркера раздает сообщения своим подписчикам.
+"""
+
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+CHANNEL_PREFIX = "comments:"
+
+
+class Subscription:
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.maxsize = maxsize
+        # Медленный клиент: сообщения потеряны, поток закрывается, а клиент
+        # переподключается с Last-Event-ID и добирает их из базы
+        self.overflowed = False
+
+    def _put(self, message):
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            self.overflowed = True
+            message = None
+        self.queue.put_nowait(message)
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, ad_id):
+        subscription = Subscription(
+            asyncio.get_running_loop(), settings.COMMENT_STREAM_QUEUE_SIZE
+        )
+        with self._lock:
+            self._subscribers.setdefault(ad_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, ad_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(ad_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[ad_id]
+
+    def subscriber_count(self, ad_id=None):
+        with self._lock:
+            if ad_id is not None:
+                return len(self._subscribers.get(ad_id, ()))
+            return sum(map(len, self._subscribers.values()))
+
+    def dispatch(self, ad_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(ad_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:
+                # Цикл уже закрыт (воркер останавливается)
+                self.unsubscribe(ad_id, subscription)
+
+
+broker = Broker()
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _redis_client():
+    """Клиент Redis и поток-слушатель; создаются при первом обращении."""
+    global _redis
+    with _redis_lock:
+        if _redis is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImproperlyConfigured(
+                    "Для COMMENT_STREAM_REDIS_URL нужен пакет redis."
+                )
+            _redis = redis.Redis.from_url(settings.COMMENT_STREAM_REDIS_URL)
+            threading.Thread(target=_listen, args=(_redis,), daemon=True).start()
+    return _redis
+
+
+def _listen(client):
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.psubscribe(CHANNEL_PREFIX + "*")
+    for item in pubsub.listen():
+        ad_id = int(item["channel"].decode().removeprefix(CHANNEL_PREFIX))
+        broker.dispatch(ad_id, json.loads(item["data"]))
+
+
+def listen():
+    """Готовит воркер к приему сообщений из Redis (если он настроен)."""
+    if settings.COMMENT_STREAM_REDIS_URL:
+        _redis_client()
+
+
+def publish(ad_id, message):
+    """Отправляет сообщение подписчикам объявления ad_id (message — dict)."""
+    if settings.COMMENT_STREAM_REDIS_URL:
+        _redis_client().publish(f"{CHANNEL_PREFIX}{ad_id}", json.dumps(message))
+    else:
+        broker.dispatch(ad_id, message)
+
+
+def format_event(message):
+    data = json.dumps(message, ensure_ascii=False, default=str)
+    return f"id: {message['id']}\nevent: comment\ndata: {data}\n\n"
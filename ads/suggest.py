@@ -0,0 +1,191 @@
+# ads/suggest.py
+"""Подсказки поиска по префиксу из заголовков объявлений.
+
+Индекс живет в памяти воркера: отсортированная таблица терминов (слова и
+целые заголовки) с числом объявлений. Префикс — это непрерывный диапазон
+таблицы, который находится бинарным поиском. В индексе только активные
+неудаленные объявления. Воркер, обработавший создание/изменение/удаление,
+обновляет индекс сразу; остальные подхватят изменения при периодической
+пересборке (SUGGEST_REFRESH_SECONDS).
+"""
+
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Ad, AdStatus
+
+WORD_RE = re.compile(r"\w+")
+# Для коротких префиксов диапазон велик, их результаты запоминаются
+CACHED_PREFIX_LENGTH = 2
+
+
+def terms_for(title):
+    normalized = " ".join(WORD_RE.findall(title.lower()))
+    terms = {word for word in normalized.split() if len(word) > 1}
+    if normalized:
+        terms.add(normalized)
+    return terms
+
+
+class SuggestIndex:
+    """Индекс по парам (ad_id, title).
+
+    Заголовок каждого объявления запоминается, поэтому add и remove
+    идемпотентны: повторное добавление или удаление объявления, которого
+    нет в индексе, не сбивает счетчики терминов других объявлений.
+    """
+
+    def __init__(self, ads=()):
+        self._lock = threading.Lock()
+        self._titles = {}
+        self._counts = {}
+        for ad_id, title in ads:
+            self._titles[ad_id] = title
+            for term in terms_for(title):
+                self._counts[term] = self._counts.get(term, 0) + 1
+        self._terms = sorted(self._counts)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._terms)
+
+    def add(self, ad_id, title):
+        with self._lock:
+            old_title = self._titles.get(ad_id)
+            if old_title == title:
+                return
+            if old_title is not None:
+                self._remove_terms(old_title)
+            self._titles[ad_id] = title
+            for term in terms_for(title):
+                count = self._counts.get(term, 0)
+                if not count:
+                    insort(self._terms, term)
+                self._counts[term] = count + 1
+            self._cache.clear()
+
+    def remove(self, ad_id):
+        with self._lock:
+            title = self._titles.pop(ad_id, None)
+            if title is not None:
+                self._remove_terms(title)
+                self._cache.clear()
+
+    def _remove_terms(self, title):
+        for term in terms_for(title):
+            count = self._counts[term]
+            if count > 1:
+                self._counts[term] = count - 1
+            else:
+                del self._counts[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def suggest(self, prefix, limit):
+        prefix = " ".join(WORD_RE.findall(prefix.lower()))
+        if not prefix:
+            return []
+        cache_key = (prefix, limit)
+        if len(prefix) <= CACHED_PREFIX_LENGTH and cache_key in self._cache:
+            return self._cache[cache_key]
+
+        with self._lock:
+            start = bisect_left(self._terms, prefix)
+            end = bisect_left(self._terms, prefix + "\uffff", lo=start)
+            result = heapq.nlargest(
+                limit,
+                self._terms[start:end],
+                key=lambda term: (self._counts[term], -len(term)),
+            )
+            if len(prefix) <= CACHED_PREFIX_LENGTH:
+                self._cache[cache_key] = result
+        return result
+
+
+_index = None
+_built_at = 0.0
+_build_lock = threading.Lock()
+# Изменения, пришедшие во время пересборки: переносятся в новый индекс
+# перед подменой. None — пересборка не идет
+_changes = None
+_changes_lock = threading.Lock()
+
+
+def get_index():
+    """Индекс воркера; пересобирается, если старше SUGGEST_REFRESH_SECONDS.
+
+    Пересобирает один запрос, остальные тем временем отвечают по старому
+    индексу; ждут только самые первые запросы, пока индекса еще нет.
+    """
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _rebuild()
+    elif time.monotonic() - _built_at > settings.SUGGEST_REFRESH_SECONDS:
+        if _build_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - _built_at > settings.SUGGEST_REFRESH_SECONDS:
+                    _rebuild()
+            finally:
+                _build_lock.release()
+    return _index
+
+
+def _rebuild():
+    global _index, _built_at, _changes
+    with _changes_lock:
+        _changes = []
+    try:
+        ads = Ad.objects.active().values_list("pk", "title")
+        index = SuggestIndex(ads.iterator(chunk_size=5000))
+        with _changes_lock:
+            for ad_id, title in _changes:
+                _apply(index, ad_id, title)
+            _index = index
+            _built_at = time.monotonic()
+    finally:
+        with _changes_lock:
+            _changes = None
+
+
+def _apply(index, ad_id, title):
+    if title is None:
+        index.remove(ad_id)
+    else:
+        index.add(ad_id, title)
+
+
+def _update(ad_id, title):
+    with _changes_lock:
+        if _changes is not None:
+            _changes.append((ad_id, title))
+        if _index is not None:
+            _apply(_index, ad_id, title)
+
+
+def reset():
+    global _index
+    _index = None
+
+
+def is_indexed(ad):
+    """Попадает ли объявление в индекс: то же условие, что и при пересборке."""
+    return (
+        ad.status == AdStatus.ACTIVE
+        and ad.deleted_at is None
+        and (ad.expires_at is None or ad.expires_at > timezone.now())
+    )
+
+
+def ad_saved(ad):
+    """После создания или изменения, в том числе смены статуса."""
+    _update(ad.pk, ad.title if is_indexed(ad) else None)
+
+
+def ad_deleted(ad):
+    _update(ad.pk, None)
@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads.models import Ad, AdStatus
+from ads.serializers import AdShortSerializer
+from users.models import User
+
+
+class AuthorAdsTests(APITestCase):
+    """Тесты списков объявлений автора"""
+
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create_user(
+            email="dash@example.com", password="pass"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="pass"
+        )
+        for i in range(5):
+            Ad.objects.create(
+                title=f"Ad {i}", description="Desc", price=i, author=self.seller
+            )
+        Ad.objects.create(
+            title="Draft",
+            description="Desc",
+            price=1,
+            author=self.seller,
+            status=AdStatus.DRAFT,
+        )
+        Ad.objects.create(
+            title="Foreign", description="Desc", price=1, author=self.other
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_public_author_ads_are_active_only(self):
+        url = reverse("author-ads", kwargs={"user_id": self.seller.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 5)
+        titles = [ad["title"] for ad in response.data["results"]]
+        self.assertEqual(titles, [f"Ad {i}" for i in reversed(range(5))])
+        self.assertNotIn("description", response.data["results"][0])
+
+    def test_my_ads_include_drafts_and_use_cursor(self):
+        self.client.force_authenticate(self.seller)
+        response = self.client.get(reverse("my-ads"), {"page_size": 4})
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(len(response.data["results"]), 4)
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["next"])
+
+    def test_count_is_cached_and_invalidated_on_create(self):
+        url = reverse("author-ads", kwargs={"user_id": self.seller.pk})
+        self.client.get(url)
+        with self.assertNumQueries(1):  # только страница, без COUNT
+            self.client.get(url)
+
+        self.client.force_authenticate(self.seller)
+        self.client.post(
+            reverse("ad-create"),
+            {"title": "New", "description": "Desc", "price": 10},
+            format="json",
+        )
+        self.assertEqual(self.client.get(url).data["count"], 6)
+
+    def test_count_invalidated_by_expire_ads(self):
+        url = reverse("author-ads", kwargs={"user_id": self.seller.pk})
+        self.assertEqual(self.client.get(url).data["count"], 5)
+
+        ad = Ad.objects.filter(author=self.seller, title="Ad 0").get()
+        Ad.objects.filter(pk=ad.pk).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        call_command("expire_ads", stdout=StringIO())
+        self.assertEqual(self.client.get(url).data["count"], 4)
+
+    def test_active_count_expires_with_nearest_ad(self):
+        """Кеш числа активных живет не дольше, чем до ближайшего expires_at"""
+        url = reverse("author-ads", kwargs={"user_id": self.seller.pk})
+        soon = timezone.now() + timedelta(seconds=30)
+        Ad.objects.filter(author=self.seller, title="Ad 0").update(expires_at=soon)
+        self.assertEqual(self.client.get(url).data["count"], 5)
+
+        # Прошло 40 секунд: объявление истекло без записи в базу
+        Ad.objects.filter(author=self.seller, title="Ad 0").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        later = time.time() + 40
+        with mock.patch(
+            "django.core.cache.backends.locmem.time.time", return_value=later
+        ):
+            self.assertEqual(self.client.get(url).data["count"], 4)
+
+    def test_author_index_covers_short_serializer(self):
+        """Индекс автора покрывает все поля, которые выбирает список"""
+        index = next(i for i in Ad._meta.indexes if i.name == "ad_author_created_idx")
+        covered = {"id", "author", "created_at", *index.include}
+        self.assertLessEqual(set(AdShortSerializer.Meta.fields), covered)
@@ -0,0 +1,94 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads.models import Ad, Comment
+from users.models import User
+
+
+class BulkCommentTests(APITestCase):
+    """Тесты массовой модерации и импорта комментариев"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email="moderator@example.com", password="pass", role="admin"
+        )
+        self.user = User.objects.create_user(
+            email="spammer@example.com", password="pass"
+        )
+        self.ad = Ad.objects.create(
+            title="Ad", description="Desc", price=100, author=self.admin
+        )
+        self.other_ad = Ad.objects.create(
+            title="Other", description="Desc", price=100, author=self.admin
+        )
+        self.spam = [
+            Comment.objects.create(ad=self.ad, author=self.user, text=f"spam {i}")
+            for i in range(3)
+        ]
+        self.legit = Comment.objects.create(ad=self.ad, author=self.admin, text="ok")
+        self.client.force_authenticate(self.admin)
+
+    def test_hide_by_author_hides_from_listing(self):
+        """Скрытые комментарии не попадают в список"""
+        response = self.client.post(
+            reverse("comment-moderate"),
+            {"action": "hide", "author": self.user.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["affected"], 3)
+
+        response = self.client.get(
+            reverse("comment-list", kwargs={"ad_id": self.ad.pk})
+        )
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(reverse("ad-detail", kwargs={"pk": self.ad.pk}))
+        self.assertEqual(len(response.data["comments"]), 1)
+
+    def test_delete_by_ids_in_single_query(self):
+        """Удаление по списку id выполняется одним UPDATE (мягкое удаление)"""
+        ids = [comment.pk for comment in self.spam[:2]]
+        with self.assertNumQueries(3):  # SAVEPOINT, UPDATE, RELEASE
+            response = self.client.post(
+                reverse("comment-moderate"),
+                {"action": "delete", "ids": ids},
+                format="json",
+            )
+        self.assertEqual(response.data["affected"], 2)
+        self.assertFalse(Comment.objects.filter(pk__in=ids).exists())
+        self.assertEqual(Comment.all_objects.filter(pk__in=ids).count(), 2)
+
+    def test_selector_required(self):
+        response = self.client.post(
+            reverse("comment-moderate"), {"action": "delete"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_moderation_requires_admin(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse("comment-moderate"),
+            {"action": "delete", "ad": self.ad.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Comment.objects.count(), 4)
+
+    def test_import_uses_bulk_create(self):
+        """Импорт пакета комментариев"""
+        payload = [
+            {"ad": self.other_ad.pk, "text": f"imported {i}", "author": self.user.pk}
+            for i in range(10)
+        ] + [{"ad": self.other_ad.pk, "text": "by moderator"}]
+        response = self.client.post(reverse("comment-import"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 11)
+        self.assertEqual(self.other_ad.comments.filter(author=self.user).count(), 10)
+        self.assertEqual(self.other_ad.comments.filter(author=self.admin).count(), 1)
+
+    def test_import_rejects_unknown_ad(self):
+        payload = [{"ad": 999999, "text": "x"}]
+        response = self.client.post(reverse("comment-import"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["ad"], ["Объявление 999999 не найдено."])
@@ -0,0 +1,163 @@
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads import fingerprint
+from ads.models import Ad, AdFingerprint, AdStatus
+from users.models import User
+
+TITLE = "Продам iPhone 13 128GB синий"
+DESCRIPTION = (
+    "Телефон в отличном состоянии, без царапин, полный комплект, коробка и чек. "
+    "Аккумулятор 92%. Торг уместен при осмотре."
+)
+
+
+def gradient(size, flip=False):
+    image = Image.new("L", (size, size))
+    image.putdata(
+        [
+            (size - x if flip else x) * 255 // size
+            for y in range(size)
+            for x in range(size)
+        ]
+    )
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+class FingerprintTests(APITestCase):
+    """Тесты поиска дублей объявлений"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="dup@example.com", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def _create(self, title=TITLE, description=DESCRIPTION):
+        return self.client.post(
+            reverse("ad-create"),
+            {"title": title, "description": description, "price": 100},
+            format="json",
+        )
+
+    def test_hashes(self):
+        original = fingerprint.simhash(TITLE, DESCRIPTION)
+        edited = fingerprint.simhash(TITLE.upper(), DESCRIPTION + " Срочно!")
+        other = fingerprint.simhash("Велосипед горный", "Рама алюминий, 21 скорость")
+        self.assertLessEqual(fingerprint.distance(original, edited), 3)
+        self.assertGreater(fingerprint.distance(original, other), 3)
+
+        small, large = gradient(32), gradient(200)
+        self.assertEqual(fingerprint.dhash(small), fingerprint.dhash(large))
+        self.assertEqual(small.tell(), 0)
+        self.assertGreater(
+            fingerprint.distance(
+                fingerprint.dhash(small), fingerprint.dhash(gradient(32, True))
+            ),
+            3,
+        )
+
+    @override_settings(ADS_DUPLICATE_POLICY="reject")
+    def test_reject_policy(self):
+        first = self._create()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        response = self._create(
+            title=TITLE.lower(), description=DESCRIPTION + " Срочно!"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(str(response.data["duplicate_of"]), str(first.data["id"]))
+        self.assertEqual(self._create("Велосипед", "Горный").status_code, 201)
+
+    def test_flag_policy_and_soft_deleted_original(self):
+        first = self._create()
+        second = self._create()
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            AdFingerprint.objects.get(pk=second.data["id"]).duplicate_of_id,
+            first.data["id"],
+        )
+        Ad.objects.filter(pk__in=[first.data["id"], second.data["id"]]).soft_delete()
+        third = self._create()
+        self.assertIsNone(AdFingerprint.objects.get(pk=third.data["id"]).duplicate_of)
+
+    @override_settings(ADS_DUPLICATE_POLICY="reject")
+    def test_other_authors_ads_are_not_compared(self):
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        draft = Ad.objects.create(
+            title=TITLE,
+            description=DESCRIPTION,
+            price=1,
+            author=other,
+            status=AdStatus.DRAFT,
+        )
+        fingerprint.store(draft, fingerprint.for_ad(draft))
+        response = self._create()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("duplicate_of", response.data)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_same_text_different_image_is_duplicate(self):
+        for flip in (False, True):
+            response = self.client.post(
+                reverse("ad-create"),
+                {
+                    "title": TITLE,
+                    "description": DESCRIPTION,
+                    "price": 1,
+                    "image": SimpleUploadedFile("a.png", gradient(64, flip).read()),
+                },
+                format="multipart",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        record = AdFingerprint.objects.get(pk=response.data["id"])
+        self.assertIsNotNone(record.duplicate_of_id)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_same_image_different_text_is_duplicate(self):
+        for title in ("Кресло", "Стул офисный"):
+            response = self.client.post(
+                reverse("ad-create"),
+                {
+                    "title": title,
+                    "description": title,
+                    "price": 1,
+                    "image": SimpleUploadedFile("a.png", gradient(64).read()),
+                },
+                format="multipart",
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        record = AdFingerprint.objects.get(pk=response.data["id"])
+        self.assertIsNotNone(record.duplicate_of_id)
+        self.assertTrue(Ad.objects.get(pk=response.data["id"]).image)
+
+    def test_dedupe_command(self):
+        ads = [
+            Ad.objects.create(
+                title=TITLE, description=DESCRIPTION, price=1, author=self.user
+            )
+            for _ in range(3)
+        ]
+        Ad.objects.create(
+            title="Велосипед", description="Горный", price=1, author=self.user
+        )
+
+        out = StringIO()
+        call_command("dedupe_ads", "--batch-size", "2", stdout=out)
+        self.assertIn("Проверено объявлений: 4, дублей: 2", out.getvalue())
+        self.assertEqual(
+            set(AdFingerprint.objects.values_list("duplicate_of_id", flat=True)),
+            {None, ads[0].pk},
+        )
+
+        call_command("dedupe_ads", "--delete", stdout=StringIO())
+        self.assertEqual(Ad.objects.count(), 2)
+        self.assertTrue(Ad.objects.filter(pk=ads[0].pk).exists())
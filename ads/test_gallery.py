@@ -0,0 +1,95 @@
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads.models import Ad, AdImage
+from users.models import User
+
+
+def upload(name, color, size=(800, 600)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class GalleryTests(APITestCase):
+    """Тесты галереи объявления"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="gal@example.com", password="pass")
+        self.ad = Ad.objects.create(
+            title="T", description="D", price=1, author=self.user
+        )
+        self.url = reverse("ad-image-list", kwargs={"ad_id": self.ad.pk})
+        self.client.force_authenticate(self.user)
+
+    def _upload(self, *files):
+        return self.client.post(self.url, {"images": list(files)}, format="multipart")
+
+    def test_upload_builds_thumbnails_and_cover(self):
+        response = self._upload(upload("a.png", "red"), upload("b.png", "blue"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item["position"] for item in response.data], [0, 1])
+
+        first = AdImage.objects.get(pk=response.data[0]["id"])
+        with Image.open(first.thumbnail) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 240))
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.cover.name, first.thumbnail.name)
+
+        listing = self.client.get(reverse("ad-list")).data["results"][0]
+        self.assertNotIn("images", listing)
+        self.assertTrue(listing["cover"].endswith(first.thumbnail.name))
+
+        detail = self.client.get(reverse("ad-detail", kwargs={"pk": self.ad.pk}))
+        self.assertEqual(len(detail.data["images"]), 2)
+
+    def test_reorder_and_delete_update_cover(self):
+        first, second = self._upload(
+            upload("a.png", "red"), upload("b.png", "blue")
+        ).data
+        url = reverse(
+            "ad-image-detail", kwargs={"ad_id": self.ad.pk, "pk": first["id"]}
+        )
+        self.client.patch(url, {"position": 5}, format="json")
+        self.ad.refresh_from_db()
+        self.assertEqual(
+            self.ad.cover.name, AdImage.objects.get(pk=second["id"]).thumbnail.name
+        )
+
+        self.client.delete(
+            reverse("ad-image-detail", kwargs={"ad_id": self.ad.pk, "pk": second["id"]})
+        )
+        self.client.delete(url)
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.cover.name, "")
+
+    def test_invalid_file_rejects_whole_batch(self):
+        bogus = SimpleUploadedFile("x.png", b"not an image")
+        response = self._upload(upload("a.png", "red"), bogus)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(AdImage.objects.exists())
+
+    def test_extension_comes_from_image_format(self):
+        response = self._upload(upload("evil.html", "red"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # PNG под именем .jpg сохраняется как .png
+        response = self._upload(upload("photo.jpg", "red"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        image = AdImage.objects.get(pk=response.data[0]["id"])
+        self.assertTrue(image.image.name.endswith(".png"))
+        self.assertTrue(image.thumbnail.name.endswith(".jpg"))
+
+    def test_only_author_uploads(self):
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        self.client.force_authenticate(other)
+        response = self._upload(upload("a.png", "red"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
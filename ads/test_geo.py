@@ -0,0 +1,73 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads import geo
+from ads.models import Ad
+from users.models import User
+
+
+class GeoSearchTests(APITestCase):
+    """Тесты поиска объявлений рядом"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="geo@example.com", password="pass")
+        points = {
+            "Kremlin": (55.7520, 37.6175),
+            "Arbat": (55.7494, 37.5912),  # ~1.7 км
+            "Khimki": (55.8970, 37.4297),  # ~20 км
+            "Piter": (59.9386, 30.3141),  # ~630 км
+        }
+        for title, (lat, lng) in points.items():
+            Ad.objects.create(
+                title=title,
+                description="Desc",
+                price=1,
+                author=self.user,
+                latitude=lat,
+                longitude=lng,
+            )
+        Ad.objects.create(
+            title="Nowhere", description="Desc", price=1, author=self.user
+        )
+
+    def test_geohash_filled_on_save(self):
+        ad = Ad.objects.get(title="Kremlin")
+        self.assertTrue(ad.geohash.startswith("ucfv0"))
+        self.assertEqual(Ad.objects.get(title="Nowhere").geohash, "")
+
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        response = self.client.get(
+            reverse("ad-list"), {"near": "55.7520,37.6175", "radius": 25}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [ad["title"] for ad in results], ["Kremlin", "Arbat", "Khimki"]
+        )
+        self.assertAlmostEqual(results[1]["distance"], 1.66, places=1)
+
+    def test_small_radius(self):
+        response = self.client.get(
+            reverse("ad-list"), {"near": "55.7520,37.6175", "radius": 5}
+        )
+        titles = [ad["title"] for ad in response.data["results"]]
+        self.assertEqual(titles, ["Kremlin", "Arbat"])
+
+    def test_invalid_params(self):
+        response = self.client.get(reverse("ad-list"), {"near": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("ad-list"), {"near": "10,10", "radius": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_covering_cells_contain_circle(self):
+        """Все точки на границе круга попадают в покрывающие ячейки"""
+        cells = geo.covering_cells(55.75, 37.61, 10)
+        for lat, lng in [
+            (55.84, 37.61),
+            (55.66, 37.61),
+            (55.75, 37.77),
+            (55.75, 37.45),
+        ]:
+            hash_ = geo.encode(lat, lng)
+            self.assertTrue(any(hash_.startswith(cell) for cell in cells))
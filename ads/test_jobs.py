@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ads import jobs
+from ads.models import Ad, Job
+from users.models import User
+
+
+class CommentNotificationTests(APITestCase):
+    """Тесты очереди заданий и дайджестов о комментариях"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="p")
+        self.reader = User.objects.create_user(email="reader@example.com", password="p")
+        self.ad = Ad.objects.create(
+            title="Диван", description="D", price=1, author=self.owner
+        )
+
+    def _comment(self, user, text):
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("comment-list", kwargs={"ad_id": self.ad.pk}), {"text": text}
+            )
+
+    def _make_due(self, **filters):
+        Job.objects.filter(**filters).update(run_after=timezone.now())
+
+    def test_enqueued_on_commit_with_delay(self):
+        self._comment(self.owner, "Свой комментарий")
+        self.assertFalse(Job.objects.exists())
+
+        self._comment(self.reader, "Еще продаете?")
+        job = Job.objects.get()
+        self.assertEqual(job.key, f"user:{self.owner.pk}")
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(jobs.run_once(), 0)
+
+    def test_digest_coalesces_pending_jobs_of_same_author(self):
+        self._comment(self.reader, "Первый")
+        self._comment(self.reader, "Второй")
+        self._make_due(pk=Job.objects.order_by("pk").first().pk)
+
+        out = StringIO()
+        call_command("run_jobs", "--once", stdout=out)
+        self.assertIn("Обработано заданий: 2", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["owner@example.com"])
+        self.assertIn("Первый", mail.outbox[0].body)
+        self.assertIn("Второй", mail.outbox[0].body)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_MAX_ATTEMPTS=2)
+    def test_failed_job_is_retried_then_marked_failed(self):
+        jobs.enqueue("comment_notification", {"comment_id": 1})
+        with mock.patch.dict(
+            jobs.HANDLERS, comment_notification=mock.Mock(side_effect=OSError)
+        ):
+            self.assertEqual(jobs.run_once(), 1)
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts), (Job.Status.PENDING, 1))
+            self.assertGreater(job.run_after, timezone.now())
+
+            self._make_due()
+            jobs.run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIn("OSError", job.error)
+
+    def test_expired_lease_is_reclaimed(self):
+        jobs.enqueue("comment_notification", {"comment_id": 1})
+        first = jobs.claim(10)
+        self.assertEqual(jobs.claim(10), [])
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        second = jobs.claim(10)
+        self.assertEqual([job.pk for job in second], [first[0].pk])
+        self.assertNotEqual(second[0].lock_token, first[0].lock_token)
+
+        # Опоздавший первый воркер не трогает задание, перехваченное вторым
+        handler = mock.Mock(side_effect=[None, OSError])
+        with mock.patch.dict(jobs.HANDLERS, comment_notification=handler):
+            jobs.process(first)
+            self.assertEqual(Job.objects.get().lock_token, second[0].lock_token)
+            jobs.process(first)
+        job = Job.objects.get()
+        self.assertEqual(job.lock_token, second[0].lock_token)
+        self.assertEqual(job.error, "")
@@ -0,0 +1,90 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads.models import Ad, AdStatus, Comment, Job
+from users.models import User
+
+
+class AdLifecycleTests(APITestCase):
+    """Тесты статусов и срока публикации объявлений"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="life@example.com", password="pass")
+        self.active = Ad.objects.create(
+            title="Active", description="Desc", price=1, author=self.user
+        )
+        self.draft = Ad.objects.create(
+            title="Draft",
+            description="Desc",
+            price=1,
+            author=self.user,
+            status=AdStatus.DRAFT,
+        )
+        self.sold = Ad.objects.create(
+            title="Sold",
+            description="Desc",
+            price=1,
+            author=self.user,
+            status=AdStatus.SOLD,
+        )
+        self.overdue = Ad.objects.create(
+            title="Overdue",
+            description="Desc",
+            price=1,
+            author=self.user,
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+    def test_list_contains_only_live_inventory(self):
+        response = self.client.get(reverse("ad-list"))
+        titles = [ad["title"] for ad in response.data["results"]]
+        self.assertEqual(titles, ["Active"])
+
+    def test_expire_command_updates_in_batches(self):
+        call_command("expire_ads", batch_size=1, stdout=StringIO())
+        self.overdue.refresh_from_db()
+        self.active.refresh_from_db()
+        self.assertEqual(self.overdue.status, AdStatus.EXPIRED)
+        self.assertEqual(self.active.status, AdStatus.ACTIVE)
+
+    def test_draft_visible_only_to_author(self):
+        url = reverse("ad-detail", kwargs={"pk": self.draft.pk})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_draft_comments_visible_only_to_author(self):
+        comment = Comment.objects.create(ad=self.draft, author=self.user, text="c")
+        url = reverse("comment-list", kwargs={"ad_id": self.draft.pk})
+        detail = reverse(
+            "comment-detail", kwargs={"ad_id": self.draft.pk, "pk": comment.pk}
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(detail).status_code, status.HTTP_404_NOT_FOUND)
+
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        self.client.force_authenticate(other)
+        response = self.client.post(url, {"text": "Еще продаете?"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Job.objects.exists())
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(len(self.client.get(url).data["results"]), 1)
+
+    def test_republish_extends_expiry(self):
+        """Повторная публикация продлевает срок"""
+        self.client.force_authenticate(self.user)
+        url = reverse("ad-detail", kwargs={"pk": self.overdue.pk})
+        self.overdue.status = AdStatus.EXPIRED
+        self.overdue.save()
+
+        response = self.client.patch(url, {"status": "active"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.overdue.refresh_from_db()
+        self.assertGreater(self.overdue.expires_at, timezone.now())
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaViewTests(TestCase):
+    """Тесты отдачи медиафайлов"""
+
+    def setUp(self):
+        for name in ("ads/a.txt", "private/p.txt", "cas/ab/cd/abcd.txt"):
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(b"0123456789")
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_and_range_requests(self):
+        response = self.client.get("/media/ads/a.txt")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(self._body(response), b"0123456789")
+
+        response = self.client.get("/media/ads/a.txt", HTTP_RANGE="bytes=2-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-4/10")
+        self.assertEqual(self._body(response), b"234")
+
+        response = self.client.get("/media/ads/a.txt", HTTP_RANGE="bytes=-3")
+        self.assertEqual(self._body(response), b"789")
+
+        response = self.client.get("/media/ads/a.txt", HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+
+        modified = os.path.getmtime(os.path.join(settings.MEDIA_ROOT, "ads/a.txt"))
+        response = self.client.get(
+            "/media/ads/a.txt", HTTP_IF_MODIFIED_SINCE=http_date(modified)
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_and_traversal(self):
+        self.assertEqual(self.client.get("/media/ads/none.txt").status_code, 404)
+        self.assertEqual(self.client.get("/media/../settings.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/ads").status_code, 404)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=True)
+    def test_accel_redirect(self):
+        response = self.client.get("/media/cas/ab/cd/abcd.txt")
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/cas/ab/cd/abcd.txt"
+        )
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response.content, b"")
+
+    @override_settings(MEDIA_PROTECTED_PREFIXES=("private/",))
+    def test_protected_prefix_requires_login(self):
+        self.assertEqual(self.client.get("/media/private/p.txt").status_code, 404)
+        user = User.objects.create_user(email="media@example.com", password="pass")
+        response = self.client.get(
+            "/media/private/p.txt",
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ads.models import Ad, ArchivedAd, MediaBlob
+from users.models import User
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaGarbageCollectorTests(TestCase):
+    """Тесты команды gc_media"""
+
+    def _file(self, name, age_hours=48):
+        from django.conf import settings
+
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"12345")
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_deletes_only_old_unreferenced_files(self):
+        user = User.objects.create_user(email="gc@example.com", password="pass")
+        Ad.objects.create(
+            title="T", description="D", price=1, author=user, image="ads/live.jpg"
+        )
+        ArchivedAd.objects.create(
+            id=999,
+            title="A",
+            price=1,
+            description="D",
+            author_id=user.pk,
+            created_at=timezone.now(),
+            image="ads/archived.jpg",
+        )
+        kept = [
+            self._file("ads/live.jpg"),
+            self._file("ads/archived.jpg"),
+            self._file("ads/fresh.jpg", age_hours=1),
+        ]
+        orphan = self._file("cas/ab/cd/orphan.jpg")
+        MediaBlob.objects.create(name="cas/ab/cd/orphan.jpg", size=5)
+
+        out = StringIO()
+        call_command("gc_media", "--dry-run", "-v", "2", stdout=out)
+        self.assertIn("cas/ab/cd/orphan.jpg", out.getvalue())
+        self.assertIn("Будет удалено файлов: 1, байт: 5", out.getvalue())
+        self.assertTrue(os.path.exists(orphan))
+
+        call_command("gc_media", "--batch-size", "2", stdout=StringIO())
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(all(os.path.exists(path) for path in kept))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_rechecks_references_before_deleting(self):
+        user = User.objects.create_user(email="gc@example.com", password="pass")
+        Ad.objects.create(
+            title="T", description="D", price=1, author=user, image="ads/new.jpg"
+        )
+        path = self._file("ads/new.jpg")
+        # Ссылка появилась после того, как снимок ссылок был собран
+        with mock.patch("ads.mediagc.collect_references"):
+            call_command("gc_media", stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
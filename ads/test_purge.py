@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+
+from ads import fingerprint
+from ads.models import Ad, AdFingerprint, Comment, PurgeJob
+from ads.purge import (
+    claim_job,
+    run_job,
+    schedule_ad_deletion,
+    schedule_user_deletion,
+)
+from users.models import User
+
+
+class PurgeTests(APITestCase):
+    """Тесты мягкого удаления с фоновой очисткой"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email="seller@example.com", password="pass"
+        )
+        self.reader = User.objects.create_user(
+            email="reader@example.com", password="pass"
+        )
+        self.ad = Ad.objects.create(
+            title="Busy ad", description="Desc", price=100, author=self.author
+        )
+        self.other_ad = Ad.objects.create(
+            title="Reader ad", description="Desc", price=100, author=self.reader
+        )
+        for i in range(5):
+            Comment.objects.create(ad=self.ad, author=self.reader, text=f"c{i}")
+        Comment.objects.create(ad=self.other_ad, author=self.author, text="mine")
+        Comment.objects.create(ad=self.other_ad, author=self.reader, text="keep")
+
+    def test_ad_purge_in_batches(self):
+        """Окончательное удаление объявления: комментарии удаляются пачками"""
+        job = schedule_ad_deletion(self.ad)
+        self.assertFalse(Ad.objects.filter(pk=self.ad.pk).exists())
+        self.assertEqual(Comment.objects.filter(ad_id=self.ad.pk).count(), 5)
+
+        run_job(job, batch_size=2)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, PurgeJob.Status.DONE)
+        self.assertEqual(job.deleted_rows, 6)
+        self.assertFalse(Ad.all_objects.filter(pk=self.ad.pk).exists())
+        self.assertFalse(Comment.all_objects.filter(ad_id=self.ad.pk).exists())
+
+    def test_claimed_job_is_not_taken_twice(self):
+        """Задание с действующей арендой не берется вторым запуском"""
+        job = schedule_ad_deletion(self.ad)
+        self.assertEqual(claim_job().pk, job.pk)
+        self.assertIsNone(claim_job())
+        self.assertFalse(run_job(job))
+
+        # Аренда истекла — задание брошено и достается следующему
+        PurgeJob.objects.filter(pk=job.pk).update(
+            lease_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim_job().pk, job.pk)
+
+    def test_lost_lease_stops_writes(self):
+        """Перехваченное задание не пишет прогресс и статус поверх нового"""
+        schedule_ad_deletion(self.ad)
+        job = claim_job()
+        # Другой запуск забрал задание после истечения аренды
+        PurgeJob.objects.filter(pk=job.pk).update(
+            lease_until=timezone.now() + timedelta(hours=1)
+        )
+        self.assertFalse(run_job(job, batch_size=2))
+        job.refresh_from_db()
+        self.assertEqual(job.status, PurgeJob.Status.RUNNING)
+        self.assertEqual(job.deleted_rows, 0)
+
+    def test_user_delete_deactivates_and_purges_dependents(self):
+        """Удаление аккаунта: деактивация сразу, данные — командой"""
+        self.client.force_authenticate(self.author)
+        response = self.client.delete(reverse("user-me"))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertIsNotNone(Ad.all_objects.get(pk=self.ad.pk).deleted_at)
+        # Комментарии удаленного аккаунта скрываются сразу, и на чужих объявлениях
+        self.assertFalse(Comment.objects.filter(author=self.author).exists())
+
+        call_command("purge_deleted", batch_size=2, stdout=StringIO())
+
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Ad.all_objects.filter(pk=self.ad.pk).exists())
+        self.assertEqual(list(Comment.objects.values_list("text", flat=True)), ["keep"])
+        # 5 комментариев к объявлению, само объявление, "mine" и пользователь
+        self.assertEqual(PurgeJob.objects.get().deleted_rows, 8)
+
+    def test_job_progress_visible_to_admin_only(self):
+        job = PurgeJob.objects.create(target=PurgeJob.Target.AD, object_id=self.ad.pk)
+        url = reverse("purge-job-detail", kwargs={"pk": job.pk})
+
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_superuser(email="root@example.com", password="pass")
+        self.client.force_authenticate(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.data["status"], PurgeJob.Status.PENDING)
+
+
+class PurgeConstraintTests(TransactionTestCase):
+    """Пачки фиксируются по отдельности: внешние ключи проверяются на каждой"""
+
+    def test_duplicate_in_later_batch_does_not_break_purge(self):
+        user = User.objects.create_user(email="dup@example.com", password="pass")
+        original, repost = [
+            Ad.objects.create(title="Dup", description="D", price=1, author=user)
+            for _ in range(2)
+        ]
+        fingerprint.store(original, fingerprint.for_ad(original))
+        fingerprint.store(repost, fingerprint.for_ad(repost), duplicate_of=original.pk)
+        job = schedule_user_deletion(user)
+
+        self.assertTrue(run_job(job, batch_size=1))
+        self.assertFalse(Ad.all_objects.exists())
+        self.assertFalse(AdFingerprint.objects.exists())
@@ -0,0 +1,60 @@
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads import similarity
+from ads.models import Ad, AdSimilarity, AdStatus
+from users.models import User
+
+
+class SimilarAdsTests(APITestCase):
+    """Тесты похожих объявлений"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="sim@example.com", password="pass")
+        self.phone = self._ad("iPhone 13 128GB", "Смартфон apple iphone в идеале")
+        self.phone2 = self._ad("iPhone 13 Pro", "Продаю apple iphone, без царапин")
+        self.bike = self._ad("Велосипед горный", "Горный велосипед, 21 скорость")
+
+    def _ad(self, title, description):
+        return Ad.objects.create(
+            title=title, description=description, price=1, author=self.user
+        )
+
+    def _similar(self, ad):
+        response = self.client.get(reverse("ad-similar", kwargs={"pk": ad.pk}))
+        return [item["title"] for item in response.data]
+
+    def test_vectors_are_normalized(self):
+        matrix = similarity.vectorize(["apple iphone", "", "велосипед"])
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        self.assertTrue(np.allclose(norms, [1, 0, 1], atol=1e-5))
+
+    def test_rebuild_and_lookup(self):
+        call_command("build_similar_ads", block_size=2, stdout=StringIO())
+        self.assertEqual(AdSimilarity.objects.count(), 3)
+        self.assertEqual(self._similar(self.phone)[0], "iPhone 13 Pro")
+        self.assertNotIn("iPhone 13 128GB", self._similar(self.phone))
+
+    def test_incremental_adds_new_ads_to_existing_lists(self):
+        similarity.rebuild()
+        bike2 = self._ad("Велосипед детский", "Детский велосипед, почти новый")
+
+        self.assertEqual(similarity.update_new(), 1)
+        self.assertEqual(self._similar(bike2)[0], "Велосипед горный")
+        self.assertEqual(self._similar(self.bike)[0], "Велосипед детский")
+        self.assertEqual(similarity.update_new(), 0)
+
+    def test_unknown_or_draft_ad_returns_404(self):
+        response = self.client.get(reverse("ad-similar", kwargs={"pk": 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        Ad.objects.filter(pk=self.bike.pk).update(status=AdStatus.DRAFT)
+        url = reverse("ad-similar", kwargs={"pk": self.bike.pk})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).data, [])
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads import fingerprint
+from ads.models import Ad, AdFingerprint, ArchivedAd, ArchivedComment, Comment
+from users.models import User
+
+
+class SoftDeleteTests(APITestCase):
+    """Тесты мягкого удаления и архивации"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="soft@example.com", password="pass")
+        self.ad = Ad.objects.create(
+            title="Soft", description="Desc", price=100, author=self.user
+        )
+        self.comment = Comment.objects.create(ad=self.ad, author=self.user, text="hi")
+        self.client.force_authenticate(self.user)
+
+    def test_delete_ad_is_recoverable(self):
+        """Удаленное объявление скрыто, но восстанавливается"""
+        response = self.client.delete(reverse("ad-detail", kwargs={"pk": self.ad.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Ad.objects.filter(pk=self.ad.pk).exists())
+
+        Ad.all_objects.filter(pk=self.ad.pk).restore()
+        response = self.client.get(reverse("ad-detail", kwargs={"pk": self.ad.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_comment_hidden_from_nested_list(self):
+        url = reverse(
+            "comment-detail", kwargs={"ad_id": self.ad.pk, "pk": self.comment.pk}
+        )
+        self.client.delete(url)
+
+        response = self.client.get(reverse("ad-detail", kwargs={"pk": self.ad.pk}))
+        self.assertEqual(response.data["comments"], [])
+        self.assertTrue(Comment.all_objects.filter(pk=self.comment.pk).exists())
+
+    def test_archive_moves_old_tombstones(self):
+        """Старые удаленные строки переносятся в архивные таблицы"""
+        fresh = Ad.objects.create(
+            title="Fresh", description="Desc", price=1, author=self.user
+        )
+        fresh.soft_delete()
+        old = timezone.now() - timedelta(days=60)
+        Ad.all_objects.filter(pk=self.ad.pk).update(
+            deleted_at=old, status="sold", views=7, latitude=55.75, longitude=37.62
+        )
+        Comment.objects.filter(pk=self.comment.pk).update(is_hidden=True)
+
+        call_command("archive_ads", tombstone_days=30, stdout=StringIO())
+
+        self.assertFalse(Ad.all_objects.filter(pk=self.ad.pk).exists())
+        self.assertFalse(Comment.all_objects.filter(pk=self.comment.pk).exists())
+        archived = ArchivedAd.objects.get()
+        self.assertEqual(archived.title, "Soft")
+        self.assertEqual(
+            (archived.status, archived.views, archived.latitude),
+            ("sold", 7, 55.75),
+        )
+        self.assertIsNotNone(archived.expires_at)
+        comment = ArchivedComment.objects.get()
+        self.assertEqual(comment.ad_id, self.ad.pk)
+        self.assertTrue(comment.is_hidden)
+        self.assertTrue(Ad.all_objects.filter(pk=fresh.pk).exists())
+
+    def test_archive_moves_ads_past_hot_window(self):
+        """Проданные объявления старше горячего окна уходят в архив, архив чистится"""
+        long_ago = timezone.now() - timedelta(days=400)
+        Ad.objects.filter(pk=self.ad.pk).update(created_at=long_ago, status="sold")
+        old_active = Ad.objects.create(
+            title="Old active", description="Desc", price=1, author=self.user
+        )
+        Ad.objects.filter(pk=old_active.pk).update(created_at=long_ago)
+        recent = Ad.objects.create(
+            title="Recent", description="Desc", price=1, author=self.user
+        )
+
+        call_command("archive_ads", max_age_days=180, stdout=StringIO())
+
+        # Активные по возрасту переносятся только явно
+        self.assertEqual(list(Ad.objects.all()), [recent, old_active])
+        self.assertTrue(ArchivedAd.objects.filter(pk=self.ad.pk).exists())
+        call_command(
+            "archive_ads", max_age_days=180, include_active=True, stdout=StringIO()
+        )
+        self.assertEqual(list(Ad.objects.all()), [recent])
+
+        call_command(
+            "archive_ads",
+            max_age_days=180,
+            archive_retention_days=365,
+            stdout=StringIO(),
+        )
+        self.assertFalse(ArchivedAd.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+
+    def test_archive_clears_duplicate_marks(self):
+        """Архивация оригинала снимает пометку с его копии"""
+        Ad.objects.filter(pk=self.ad.pk).update(
+            created_at=timezone.now() - timedelta(days=400), status="sold"
+        )
+        repost = Ad.objects.create(
+            title="Soft", description="Desc", price=100, author=self.user
+        )
+        fingerprint.store(self.ad, fingerprint.for_ad(self.ad))
+        fingerprint.store(repost, fingerprint.for_ad(repost), duplicate_of=self.ad.pk)
+
+        call_command("archive_ads", max_age_days=180, stdout=StringIO())
+
+        self.assertIsNone(AdFingerprint.objects.get(ad=repost).duplicate_of_id)
+        connection.check_constraints()
+
+    def test_prune_removes_orphaned_archived_comments(self):
+        """Комментарии без архивного объявления тоже удаляются по сроку"""
+        old = timezone.now() - timedelta(days=400)
+        ArchivedComment.objects.create(
+            id=999, text="orphan", author_id=self.user.pk, ad_id=12345, created_at=old
+        )
+        ArchivedComment.objects.create(
+            id=1000,
+            text="recent",
+            author_id=self.user.pk,
+            ad_id=12345,
+            created_at=timezone.now(),
+        )
+
+        call_command(
+            "archive_ads", max_age_days=0, archive_retention_days=365, stdout=StringIO()
+        )
+
+        self.assertEqual(
+            list(ArchivedComment.objects.values_list("text", flat=True)), ["recent"]
+        )
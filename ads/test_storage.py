@@ -0,0 +1,56 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import TestCase, override_settings
+
+from ads.models import MediaBlob
+from ads.storage import ContentAddressedStorage
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ContentAddressedStorageTests(TestCase):
+    """Тесты контентно-адресуемого хранилища"""
+
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+
+    def test_same_content_stored_once(self):
+        data = b"photo bytes"
+        digest = hashlib.sha256(data).hexdigest()
+        first = self.storage.save("ads/a.JPG", ContentFile(data))
+        second = self.storage.save("avatars/b.jpg", ContentFile(data))
+
+        self.assertEqual(first, f"cas/{digest[:2]}/{digest[2:4]}/{digest}.jpg")
+        self.assertEqual(first, second)
+        self.assertEqual(MediaBlob.objects.filter(name=first).count(), 1)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.storage.path(first))), [digest + ".jpg"]
+        )
+        self.assertEqual(os.listdir(self.storage.path("cas/tmp")), [])
+        self.assertEqual(self.storage.url(first), f"/media/{first}")
+
+        self.storage.delete(first)
+        # Файл удаляет gc_media, а не delete()
+        self.assertTrue(self.storage.exists(first))
+
+        # Повторное сохранение освежает mtime, чтобы gc_media не удалил
+        # файл до фиксации новой ссылки
+        os.utime(self.storage.path(first), (0, 0))
+        self.storage.save("ads/c.jpg", ContentFile(data))
+        self.assertGreater(os.path.getmtime(self.storage.path(first)), 0)
+
+    def test_temporary_upload_is_moved(self):
+        upload = TemporaryUploadedFile("big.png", "image/png", 5, None)
+        upload.write(b"12345")
+        upload.flush()
+        source = upload.temporary_file_path()
+
+        name = self.storage.save("ads/big.png", upload)
+        upload.close()
+        self.assertFalse(os.path.exists(source))
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b"12345")
+        self.assertEqual(MediaBlob.objects.get(name=name).size, 5)
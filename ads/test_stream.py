@@ -0,0 +1,115 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ads import stream
+from ads.models import Ad, AdStatus, Comment
+from users.models import User
+
+
+class CommentPublishTests(APITestCase):
+    """Публикация комментария в поток после фиксации транзакции"""
+
+    def test_publish_on_commit(self):
+        user = User.objects.create_user(email="pub@example.com", password="pass")
+        ad = Ad.objects.create(title="T", description="D", price=1, author=user)
+        self.client.force_authenticate(user)
+        with mock.patch("ads.stream.publish") as publish:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                response = self.client.post(
+                    reverse("comment-list", kwargs={"ad_id": ad.pk}), {"text": "Hi"}
+                )
+            publish.assert_not_called()
+            callbacks[0]()
+        publish.assert_called_once()
+        self.assertEqual(publish.call_args.args[0], ad.pk)
+        self.assertEqual(publish.call_args.args[1]["id"], response.data["id"])
+
+
+@override_settings(COMMENT_STREAM_MAX_AGE=1, COMMENT_STREAM_HEARTBEAT=0.2)
+class CommentStreamTests(TestCase):
+    """SSE-поток комментариев"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="sse@example.com", password="pass")
+        self.ad = Ad.objects.create(
+            title="T", description="D", price=1, author=self.user
+        )
+        self.old = Comment.objects.create(text="old", author=self.user, ad=self.ad)
+        self.url = reverse("comment-stream", kwargs={"ad_id": self.ad.pk})
+
+    async def test_backfill_then_live_events(self):
+        response = await self.async_client.get(self.url, headers={"Last-Event-ID": "0"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = response.streaming_content
+
+        self.assertTrue((await anext(events)).startswith(b"retry:"))
+        self.assertIn(b"id: %d\n" % self.old.pk, await anext(events))
+
+        # Подписка уже есть: новое сообщение приходит без обращения к базе
+        self.assertEqual(stream.broker.subscriber_count(self.ad.pk), 1)
+        stream.publish(self.ad.pk, {"id": self.old.pk + 1, "text": "new"})
+        chunk = await anext(events)
+        payload = json.loads(chunk.decode().split("data: ")[1])
+        self.assertEqual(payload["text"], "new")
+
+        self.assertEqual(await anext(events), b": ping\n\n")
+        # По истечении COMMENT_STREAM_MAX_AGE поток завершается сам
+        async for _ in events:
+            pass
+        self.assertEqual(stream.broker.subscriber_count(), 0)
+
+    async def test_backfill_reads_all_pages(self):
+        await Comment.objects.abulk_create(
+            Comment(text=str(i), author=self.user, ad=self.ad) for i in range(4)
+        )
+        with override_settings(COMMENT_STREAM_QUEUE_SIZE=2):
+            response = await self.async_client.get(
+                self.url, headers={"Last-Event-ID": "0"}
+            )
+            events = response.streaming_content
+            await anext(events)
+            chunks = [await anext(events) for _ in range(5)]
+        self.assertEqual(
+            [json.loads(c.decode().split("data: ")[1])["text"] for c in chunks],
+            ["old", "0", "1", "2", "3"],
+        )
+        await events.aclose()
+
+    async def test_draft_visible_only_to_author(self):
+        self.ad.status = AdStatus.DRAFT
+        await self.ad.asave(update_fields=["status"])
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+
+    async def test_unknown_ad(self):
+        response = await self.async_client.get(
+            reverse("comment-stream", kwargs={"ad_id": self.ad.pk + 100})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_slow_subscriber_is_closed(self):
+        with override_settings(COMMENT_STREAM_QUEUE_SIZE=2):
+            subscription = stream.broker.subscribe(self.ad.pk)
+        for pk in range(3):
+            stream.publish(self.ad.pk, {"id": pk})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        # Доставляется непрерывное начало, остальное клиент дочитает из базы
+        self.assertEqual(subscription.queue.get_nowait(), {"id": 0})
+        self.assertEqual(subscription.queue.get_nowait(), {"id": 1})
+        self.assertIsNone(subscription.queue.get_nowait())
+        stream.broker.unsubscribe(self.ad.pk, subscription)
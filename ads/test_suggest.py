@@ -0,0 +1,91 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ads import suggest
+from ads.models import Ad
+from ads.suggest import SuggestIndex
+from users.models import User
+
+
+class SuggestTests(APITestCase):
+    """Тесты подсказок поиска"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="sug@example.com", password="pass")
+        for title in ("iPhone 13", "iPhone 12", "iPad Air", "Велосипед"):
+            Ad.objects.create(title=title, description="D", price=1, author=self.user)
+
+    def _suggest(self, query):
+        return self.client.get(reverse("ad-suggest"), {"q": query}).data
+
+    def test_prefix_ranked_by_frequency(self):
+        self.assertEqual(self._suggest("iph")[0], "iphone")
+        self.assertEqual(set(self._suggest("iphone ")[1:]), {"iphone 12", "iphone 13"})
+        self.assertEqual(self._suggest("вело"), ["велосипед"])
+        self.assertEqual(self._suggest(""), [])
+
+    def test_index_follows_create_update_delete(self):
+        self._suggest("x")  # строим индекс
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse("ad-create"),
+            {"title": "Xiaomi Redmi", "description": "D", "price": 1},
+            format="json",
+        )
+        self.assertIn("xiaomi", self._suggest("xia"))
+
+        url = reverse("ad-detail", kwargs={"pk": response.data["id"]})
+        self.client.patch(url, {"title": "Samsung Galaxy"}, format="json")
+        self.assertEqual(self._suggest("xia"), [])
+        self.assertIn("samsung", self._suggest("sam"))
+
+        self.client.delete(url)
+        self.assertEqual(self._suggest("sam"), [])
+
+    def test_only_active_ads_are_indexed(self):
+        self._suggest("x")  # строим индекс
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse("ad-create"),
+            {"title": "Xbox Series", "description": "D", "price": 1, "status": "draft"},
+            format="json",
+        )
+        self.assertEqual(self._suggest("xbo"), [])
+
+        # Удаление черновика не трогает счетчики чужих терминов
+        Ad.objects.create(title="Xbox One", description="D", price=1, author=self.user)
+        suggest.reset()
+        url = reverse("ad-detail", kwargs={"pk": response.data["id"]})
+        self.client.delete(url)
+        self.assertEqual(self._suggest("xbox"), ["xbox", "xbox one"])
+
+    def test_status_change_updates_index(self):
+        self.client.force_authenticate(self.user)
+        ad = Ad.objects.get(title="Велосипед")
+        url = reverse("ad-detail", kwargs={"pk": ad.pk})
+        self.assertEqual(self._suggest("вело"), ["велосипед"])
+        self.client.patch(url, {"status": "sold"}, format="json")
+        self.assertEqual(self._suggest("вело"), [])
+        self.client.patch(url, {"status": "active"}, format="json")
+        self.assertEqual(self._suggest("вело"), ["велосипед"])
+
+    def test_stale_index_served_while_rebuilding(self):
+        """Пока один запрос пересобирает индекс, остальные не ждут"""
+        index = suggest.get_index()
+        with override_settings(SUGGEST_REFRESH_SECONDS=0):
+            with suggest._build_lock:
+                self.assertIs(suggest.get_index(), index)
+            self.assertIsNot(suggest.get_index(), index)
+
+    def test_short_prefix_cache_invalidated(self):
+        index = SuggestIndex([(1, "ab cd")])
+        self.assertEqual(index.suggest("a", 5), ["ab", "ab cd"])
+        index.add(2, "ax")
+        self.assertIn("ax", index.suggest("a", 5))
+        index.remove(1)
+        self.assertEqual(index.suggest("a", 5), ["ax"])
+        # Повторное удаление и удаление неизвестного ничего не ломают
+        index.remove(1)
+        index.remove(3)
+        self.assertEqual(index.suggest("a", 5), ["ax"])
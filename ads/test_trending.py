@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ads import counters, trending
+from ads.models import Ad, AdScore, Comment, TrendingState
+from users.models import User
+
+
+class TrendingTests(APITestCase):
+    """Тесты ленты популярных объявлений"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="trend@example.com", password="pass")
+        self.quiet, self.hot, self.viewed = [
+            Ad.objects.create(title=title, description="D", price=1, author=self.user)
+            for title in ("Quiet", "Hot", "Viewed")
+        ]
+
+    def _trending_titles(self):
+        response = self.client.get(reverse("ad-list"), {"ordering": "trending"})
+        return [ad["title"] for ad in response.data["results"]]
+
+    def test_comments_and_views_rank_ads(self):
+        for i in range(2):
+            Comment.objects.create(ad=self.hot, author=self.user, text=str(i))
+        call_command("update_trending", stdout=StringIO())
+        for _ in range(3):
+            counters.record_view(self.viewed.pk)
+        counters.flush()
+
+        # 2 комментария * 5 > 3 просмотра * 1; без активности — не в ленте
+        self.assertEqual(self._trending_titles(), ["Hot", "Viewed"])
+
+    def test_update_is_incremental(self):
+        Comment.objects.create(ad=self.hot, author=self.user, text="1")
+        self.assertEqual(trending.update(), 1)
+        self.assertEqual(trending.update(), 0)
+        self.assertTrue(Comment.objects.get().scored)
+
+    def test_late_commit_with_lower_pk_is_counted(self):
+        """Комментарий, закоммиченный позже более нового, не теряется"""
+        early = Comment.objects.create(ad=self.quiet, author=self.user, text="early")
+        Comment.objects.create(ad=self.hot, author=self.user, text="late")
+        # Более новый уже учтен, а ранний «закоммитился» только сейчас
+        Comment.objects.exclude(pk=early.pk).update(scored=True)
+        self.assertEqual(trending.update(), 1)
+        self.assertTrue(AdScore.objects.filter(ad=self.quiet).exists())
+
+    def test_hidden_and_deleted_comments_do_not_count(self):
+        Comment.objects.create(
+            ad=self.hot, author=self.user, text="hidden", is_hidden=True
+        )
+        Comment.objects.create(ad=self.hot, author=self.user, text="gone").soft_delete()
+        self.assertEqual(trending.update(), 0)
+        self.assertFalse(AdScore.objects.exists())
+        self.assertFalse(Comment.all_objects.filter(scored=False).exists())
+
+    def test_older_activity_decays(self):
+        """Старый комментарий весит меньше свежего"""
+        old = Comment.objects.create(ad=self.quiet, author=self.user, text="old")
+        Comment.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(hours=48)
+        )
+        Comment.objects.create(ad=self.hot, author=self.user, text="new")
+        trending.update()
+
+        scores = dict(AdScore.objects.values_list("ad_id", "score"))
+        self.assertAlmostEqual(scores[self.quiet.pk] / scores[self.hot.pk], 0.25, 2)
+
+    def test_rebase_keeps_order(self):
+        Comment.objects.create(ad=self.hot, author=self.user, text="1")
+        trending.update()
+        TrendingState.objects.update(
+            epoch=timezone.now() - timedelta(hours=24 * (trending.REBASE_AFTER + 2))
+        )
+        trending.update()
+        self.assertEqual(self._trending_titles(), ["Hot"])
+        self.assertLess(AdScore.objects.get().score, 1)
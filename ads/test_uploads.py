@@ -0,0 +1,147 @@
+import hashlib
+import os
+import random
+import tempfile
+from io import BytesIO
+
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ads.models import Ad, ChunkedUpload
+from users.models import User
+
+
+def png_bytes():
+    rng = random.Random(1)
+    image = Image.new("RGB", (40, 40))
+    image.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(1600)])
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    CHUNKED_UPLOAD_DIR=tempfile.mkdtemp(),
+    CHUNKED_UPLOAD_CHUNK_SIZE=1024,
+)
+class ChunkedUploadTests(APITestCase):
+    """Тесты загрузки картинок по частям"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="up@example.com", password="pass")
+        self.ad = Ad.objects.create(
+            title="T", description="D", price=1, author=self.user
+        )
+        self.client.force_authenticate(self.user)
+        self.data = png_bytes()
+
+    def _start(self, **extra):
+        response = self.client.post(
+            reverse("upload-create"),
+            {"filename": "photo.png", "size": len(self.data), **extra},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["chunk_size"], 1024)
+        return ChunkedUpload.objects.get(pk=response.data["id"])
+
+    def _put(self, upload, start, chunk, checksum=None):
+        return self.client.put(
+            reverse("upload-detail", kwargs={"pk": upload.pk}),
+            data=chunk,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(chunk) - 1}/{len(self.data)}",
+            HTTP_X_CHUNK_SHA256=checksum or sha256(chunk),
+        )
+
+    def _complete(self, upload):
+        return self.client.post(
+            reverse("upload-complete", kwargs={"pk": upload.pk}),
+            {"ad": self.ad.pk},
+            format="json",
+        )
+
+    def test_resumable_upload_attaches_image(self):
+        upload = self._start(sha256=sha256(self.data))
+        first = self.data[:1024]
+        self.assertEqual(self._put(upload, 0, first).data["offset"], 1024)
+
+        # Поврежденная часть отрезается, смещение не меняется
+        response = self._put(upload, 1024, self.data[1024:2048], checksum="0" * 64)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 1024)
+        self.assertEqual(os.path.getsize(upload.path()), 1024)
+
+        # Повтор уже принятой части: клиент узнает, откуда продолжать
+        response = self._put(upload, 0, first)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 1024)
+
+        self.assertEqual(self._complete(upload).status_code, status.HTTP_409_CONFLICT)
+
+        for start in range(1024, len(self.data), 1024):
+            response = self._put(upload, start, self.data[start : start + 1024])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._complete(upload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.ad.refresh_from_db()
+        with self.ad.image.open("rb") as file:
+            self.assertEqual(file.read(), self.data)
+        self.assertFalse(os.path.exists(upload.path()))
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ChunkedUpload.Status.COMPLETE)
+
+    def test_rejects_oversized_chunk_and_non_image(self):
+        self.data = b"x" * 2048
+        upload = self._start()
+        response = self._put(upload, 0, self.data)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self._put(upload, 0, self.data[:1024])
+        self._put(upload, 1024, self.data[1024:])
+        response = self._complete(upload)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Ad.objects.get(pk=self.ad.pk).image)
+
+    def test_upload_of_other_user_is_hidden(self):
+        upload = self._start()
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        self.client.force_authenticate(other)
+        self.assertEqual(self._put(upload, 0, self.data[:10]).status_code, 404)
+
+    def test_extension_comes_from_image_format(self):
+        response = self.client.post(
+            reverse("upload-create"),
+            {"filename": "page.html", "size": len(self.data)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("filename", response.data)
+
+        upload = self._start(filename="photo.jpg")
+        for start in range(0, len(self.data), 1024):
+            self._put(upload, start, self.data[start : start + 1024])
+        self.assertEqual(self._complete(upload).status_code, status.HTTP_200_OK)
+        self.ad.refresh_from_db()
+        self.assertTrue(self.ad.image.name.endswith(".png"))
+
+    def test_non_numeric_content_length(self):
+        upload = self._start()
+        response = self.client.put(
+            reverse("upload-detail", kwargs={"pk": upload.pk}),
+            data=self.data[:10],
+            content_type="application/octet-stream",
+            CONTENT_LENGTH="ten",
+            HTTP_CONTENT_RANGE=f"bytes 0-9/{len(self.data)}",
+            HTTP_X_CHUNK_SHA256=sha256(self.data[:10]),
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
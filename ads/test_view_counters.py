@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ads import counters
+from ads.models import Ad
+from users.models import User
+
+
+class ViewCounterTests(APITestCase):
+    """Тесты отложенной записи просмотров"""
+
+    def setUp(self):
+        user = User.objects.create_user(email="views@example.com", password="pass")
+        self.ads = [
+            Ad.objects.create(title=f"Ad {i}", description="D", price=1, author=user)
+            for i in range(3)
+        ]
+
+    def test_views_buffered_and_visible_without_db_write(self):
+        url = reverse("ad-detail", kwargs={"pk": self.ads[0].pk})
+        for _ in range(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.data["views"], 2)  # текущий просмотр еще не учтен
+        self.assertEqual(Ad.objects.get(pk=self.ads[0].pk).views, 0)
+        self.assertEqual(self.client.get(url).data["views"], 3)
+
+    def test_flush_applies_batched_case_update(self):
+        for ad, hits in zip(self.ads, (5, 1, 3)):
+            for _ in range(hits):
+                counters.record_view(ad.pk)
+
+        with mock.patch("ads.trending.record_views") as record_views:
+            with self.assertNumQueries(2):  # две пачки по 2 объявления
+                counters.flush(batch_size=2)
+        record_views.assert_called_once()
+
+        views = dict(Ad.objects.values_list("pk", "views"))
+        self.assertEqual([views[ad.pk] for ad in self.ads], [5, 1, 3])
+        self.assertEqual(counters.pending(self.ads[0].pk), 0)
+
+        counters.record_view(self.ads[0].pk)
+        counters.flush()
+        self.assertEqual(Ad.objects.get(pk=self.ads[0].pk).views, 6)
+
+    def test_failed_batch_returns_only_unwritten_views(self):
+        for ad, hits in zip(self.ads, (5, 1, 3)):
+            for _ in range(hits):
+                counters.record_view(ad.pk)
+
+        original = QuerySet.update
+        calls = []
+
+        def fail_second_batch(queryset, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise DatabaseError("connection lost")
+            return original(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", autospec=True) as update:
+            update.side_effect = fail_second_batch
+            with self.assertRaises(DatabaseError):
+                counters.flush(batch_size=2)
+
+        # Первая пачка уже в базе и в буфер не возвращается
+        self.assertEqual(Ad.objects.get(pk=self.ads[0].pk).views, 5)
+        self.assertEqual(counters.pending(self.ads[0].pk), 0)
+        self.assertEqual(counters.pending(self.ads[2].pk), 3)
+
+        with mock.patch("ads.trending.record_views"):
+            counters.flush()
+        views = dict(Ad.objects.values_list("pk", "views"))
+        self.assertEqual([views[ad.pk] for ad in self.ads], [5, 1, 3])
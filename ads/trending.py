@@ -0,0 +1,126 @@
+# ads/trending.py
+"""Инкрементальный рейтинг популярности объявлений.
+
+Каждое событие (комментарий, просмотр) добавляет к AdScore.score величину
+w * 2^((t - epoch) / half_life). Это эквивалентно экспоненциальному
+затуханию всех оценок, но не требует трогать старые строки: лента
+trending — обычный обход индекса по score. Когда множитель становится
+слишком большим, все оценки и epoch сдвигаются одним UPDATE.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils import timezone
+
+from .models import Ad, AdScore, Comment, TrendingState
+
+# Сдвиг эпохи, когда множитель превышает 2^REBASE_AFTER
+REBASE_AFTER = 256
+
+
+def _half_life():
+    return timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+
+
+def get_state(lock=False):
+    """Строка состояния; lock=True — с блокировкой до конца транзакции."""
+    queryset = TrendingState.objects
+    if lock:
+        queryset = queryset.select_for_update()
+    state, _ = queryset.get_or_create(pk=1)
+    return state
+
+
+def weight(moment, epoch):
+    return 2 ** ((moment - epoch) / _half_life())
+
+
+def add_scores(increments, batch_size=500):
+    """Прибавляет increments {ad_id: value} к оценкам пакетами."""
+    items = list(increments.items())
+    for start in range(0, len(items), batch_size):
+        batch = dict(items[start : start + batch_size])
+        existing = set(
+            AdScore.objects.filter(ad_id__in=batch).values_list("ad_id", flat=True)
+        )
+        if existing:
+            AdScore.objects.filter(ad_id__in=existing).update(
+                score=F("score")
+                + Case(
+                    *[When(ad_id=pk, then=Value(batch[pk])) for pk in existing],
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                updated_at=timezone.now(),
+            )
+        # Объявление могло быть окончательно удалено, пока событие ждало учета
+        new = Ad.all_objects.filter(
+            pk__in=[pk for pk in batch if pk not in existing]
+        ).values_list("pk", flat=True)
+        AdScore.objects.bulk_create(
+            [AdScore(ad_id=pk, score=batch[pk]) for pk in new],
+            ignore_conflicts=True,
+        )
+
+
+def record_views(deltas):
+    """Учитывает записанные просмотры {ad_id: count} (вызывается из ads.counters)."""
+    if not deltas:
+        return
+    # Эпоха читается под блокировкой: сдвиг между чтением и UPDATE
+    # завысил бы прибавку в 2^periods раз
+    with transaction.atomic():
+        state = get_state(lock=True)
+        factor = settings.TRENDING_VIEW_WEIGHT * weight(timezone.now(), state.epoch)
+        add_scores({pk: count * factor for pk, count in deltas.items()})
+
+
+def update(batch_size=1000):
+    """Учитывает комментарии, еще не вошедшие в рейтинг.
+
+    Вместо отметки по pk у комментария есть флаг scored: транзакции
+    фиксируются не в порядке pk, и отметка пропускала бы комментарии,
+    закоммиченные позже более новых. Скрытые и удаленные помечаются, но в
+    оценку не идут. Возвращает число учтенных комментариев.
+    """
+    _maybe_rebase()
+
+    counted = 0
+    while True:
+        with transaction.atomic():
+            state = get_state(lock=True)
+            rows = list(
+                Comment.all_objects.filter(scored=False)
+                .order_by("pk")
+                .values_list("pk", "ad_id", "created_at", "is_hidden", "deleted_at")[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                return counted
+            increments = {}
+            for _, ad_id, created_at, is_hidden, deleted_at in rows:
+                if is_hidden or deleted_at is not None:
+                    continue
+                increments[ad_id] = increments.get(ad_id, 0) + (
+                    settings.TRENDING_COMMENT_WEIGHT * weight(created_at, state.epoch)
+                )
+                counted += 1
+            add_scores(increments)
+            Comment.all_objects.filter(pk__in=[row[0] for row in rows]).update(
+                scored=True
+            )
+
+
+def _maybe_rebase():
+    with transaction.atomic():
+        state = get_state(lock=True)
+        periods = int((timezone.now() - state.epoch) / _half_life())
+        if periods < REBASE_AFTER:
+            return
+        AdScore.objects.update(score=F("score") * 2.0**-periods)
+        state.epoch += _half_life() * periods
+        state.save(update_fields=["epoch"])
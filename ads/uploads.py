@@ -0,0 +1,146 @@
+# ads/uploads.py
+"""Загрузка картинок объявлений по частям.
+
+Каждая часть дописывается в файл на диске небольшими блоками с подсчетом
+SHA-256, так что память на запрос ограничена размером блока. Часть с
+неверной контрольной суммой отрезается, и клиент повторяет ее с того же
+смещения. Собранный файл не копируется: хранилище перемещает его на место
+(как временный файл большой загрузки Django).
+"""
+
+import fcntl
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import validate_image_file_extension
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .models import ChunkedUpload
+
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Ошибка загрузки части; offset — с какого места продолжать."""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class AssembledFile(File):
+    """Файл, который FileSystemStorage переместит, а не скопирует."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def start(user, filename, size, sha256=""):
+    upload = ChunkedUpload.objects.create(
+        user=user, filename=os.path.basename(filename), size=size, sha256=sha256
+    )
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.path(), "xb").close()
+    return upload
+
+
+def write_chunk(upload, stream, start, length, checksum):
+    """Дописывает часть из stream и возвращает новое смещение."""
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise UploadError("Загрузка уже завершена.")
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise UploadError("Слишком большая часть.", upload.offset)
+    if start + length > upload.size:
+        raise UploadError("Часть выходит за пределы файла.", upload.offset)
+
+    with open(upload.path(), "r+b") as file:
+        try:
+            # Параллельная запись той же загрузки (в т.ч. другим процессом)
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError("Часть уже загружается.", upload.offset)
+        upload.refresh_from_db(fields=["offset"])
+        if start != upload.offset:
+            raise UploadError("Неверное смещение части.", upload.offset)
+
+        file.seek(start)
+        digest = hashlib.sha256()
+        remaining = length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            file.write(block)
+            remaining -= len(block)
+
+        if remaining or digest.hexdigest() != checksum.lower():
+            file.truncate(start)
+            raise UploadError("Часть повреждена, повторите ее.", start)
+        file.truncate(start + length)
+        file.flush()
+        os.fsync(file.fileno())
+        ChunkedUpload.objects.filter(pk=upload.pk).update(offset=F("offset") + length)
+    upload.offset = start + length
+    return upload.offset
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while block := file.read(BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete(upload, ad):
+    """Проверяет собранный файл и делает его картинкой объявления."""
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise UploadError("Загрузка уже завершена.")
+    if upload.offset != upload.size:
+        raise UploadError("Файл загружен не полностью.", upload.offset)
+    path = upload.path()
+    if upload.sha256 and _file_sha256(path) != upload.sha256.lower():
+        raise UploadError("Контрольная сумма файла не совпадает.")
+    try:
+        # verify() читает заголовки и структуру, не декодируя картинку целиком
+        with Image.open(path) as image:
+            image.verify()
+            image_format = image.format
+    except (OSError, UnidentifiedImageError):
+        raise UploadError("Файл не является изображением.")
+
+    # Расширение берется из формата, а не из имени клиента: иначе картинка,
+    # одновременно валидная как HTML, сохранилась бы как .html
+    filename = f"{os.path.splitext(upload.filename)[0]}.{image_format.lower()}"
+    try:
+        validate_image_file_extension(File(None, filename))
+    except ValidationError:
+        raise UploadError("Неподдерживаемый формат изображения.")
+    with open(path, "rb") as file:
+        ad.image.save(filename, AssembledFile(file), save=False)
+    ad.save(update_fields=["image"])
+    if os.path.exists(path):
+        os.remove(path)
+    upload.status = ChunkedUpload.Status.COMPLETE
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=["status", "completed_at"])
+    return ad
+
+
+def prune(now=None):
+    """Удаляет брошенные загрузки старше CHUNKED_UPLOAD_EXPIRE_HOURS."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRE_HOURS)
+    stale = ChunkedUpload.objects.filter(created_at__lt=cutoff)
+    for upload in stale.filter(status=ChunkedUpload.Status.UPLOADING).iterator():
+        if os.path.exists(upload.path()):
+            os.remove(upload.path())
+    deleted, _ = stale.delete()
+    return deleted
@@ -6,16 +6,52 @@ from .views import (
     AdDetailView,
     CommentListView,
     CommentDetailView,
+    CommentModerationView,
+    CommentImportView,
+    PurgeJobDetailView,
+    AuthorAdsView,
+    MyAdsView,
+    AdSimilarView,
+    AdSuggestView,
+    AdImageListView,
+    AdImageDetailView,
+    comment_stream,
+    UploadCreateView,
+    UploadDetailView,
+    UploadCompleteView,
 )
 
 urlpatterns = [
     path("ads/", AdListView.as_view(), name="ad-list"),
     path("ads/create/", AdCreateView.as_view(), name="ad-create"),
+    path("ads/suggest/", AdSuggestView.as_view(), name="ad-suggest"),
     path("ads/<int:pk>/", AdDetailView.as_view(), name="ad-detail"),
+    path("ads/<int:pk>/similar/", AdSimilarView.as_view(), name="ad-similar"),
+    path("ads/<int:ad_id>/images/", AdImageListView.as_view(), name="ad-image-list"),
+    path(
+        "ads/<int:ad_id>/images/<int:pk>/",
+        AdImageDetailView.as_view(),
+        name="ad-image-detail",
+    ),
+    path("user/me/ads/", MyAdsView.as_view(), name="my-ads"),
+    path("users/<int:user_id>/ads/", AuthorAdsView.as_view(), name="author-ads"),
     path("ads/<int:ad_id>/comments/", CommentListView.as_view(), name="comment-list"),
+    path("ads/<int:ad_id>/comments/stream/", comment_stream, name="comment-stream"),
     path(
         "ads/<int:ad_id>/comments/<int:pk>/",
         CommentDetailView.as_view(),
         name="comment-detail",
     ),
+    path(
+        "comments/moderate/", CommentModerationView.as_view(), name="comment-moderate"
+    ),
+    path("comments/import/", CommentImportView.as_view(), name="comment-import"),
+    path("uploads/", UploadCreateView.as_view(), name="upload-create"),
+    path("uploads/<uuid:pk>/", UploadDetailView.as_view(), name="upload-detail"),
+    path(
+        "uploads/<uuid:pk>/complete/",
+        UploadCompleteView.as_view(),
+        name="upload-complete",
+    ),
+    path("purge-jobs/<int:pk>/", PurgeJobDetailView.as_view(), name="purge-job-detail"),
 ]
@@ -1,18 +1,70 @@
-from rest_framework import generics, filters
+import asyncio
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.http import Http404, HttpResponseNotAllowed, StreamingHttpResponse
+from rest_framework import generics, filters, status
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Ad, Comment
-from .serializers import AdSerializer, CommentSerializer
-from .permissions import IsAuthorOrAdmin
+from users.models import User
+from . import counters, fingerprint, gallery, jobs, stream, suggest, uploads
+from .caching import author_ads_count, invalidate_author_counts
+from .filters import NearFilterBackend, TrendingOrderingFilter
+from .models import (
+    Ad,
+    AdImage,
+    AdSimilarity,
+    AdStatus,
+    ChunkedUpload,
+    Comment,
+    PurgeJob,
+)
+from .pagination import AuthorAdsPagination
+from .serializers import (
+    AdDetailSerializer,
+    AdImageSerializer,
+    AdImageUploadSerializer,
+    ChunkedUploadSerializer,
+    UploadCompleteSerializer,
+    AdSerializer,
+    AdShortSerializer,
+    CommentSerializer,
+    CommentModerationSerializer,
+    CommentImportSerializer,
+    PurgeJobSerializer,
+)
+from .permissions import IsAuthorOrAdmin, IsAdmin
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 
 
+def ads_with_comments():
+    """Объявления с видимыми комментариями, загруженными одним запросом."""
+    return Ad.objects.prefetch_related(
+        Prefetch("comments", queryset=Comment.objects.filter(is_hidden=False))
+    )
+
+
 class AdListView(generics.ListAPIView):
-    queryset = Ad.objects.all()
     serializer_class = AdSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        filters.SearchFilter,
+        TrendingOrderingFilter,
+        NearFilterBackend,
+    ]
     search_fields = ["title", "description"]
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        return ads_with_comments().active()
+
 
 class AdCreateView(generics.CreateAPIView):
     queryset = Ad.objects.all()
@@ -20,14 +72,212 @@ class AdCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        policy = settings.ADS_DUPLICATE_POLICY
+        if policy == "off":
+            serializer.save(author=self.request.user)
+        else:
+            data = serializer.validated_data
+            content = fingerprint.compute(
+                data["title"], data["description"], data.get("image")
+            )
+            duplicate_of = fingerprint.find_duplicate(content, self.request.user.pk)
+            if duplicate_of is not None and policy == "reject":
+                raise ValidationError(
+                    {
+                        "non_field_errors": [
+                            f"Такое объявление уже опубликовано (id {duplicate_of})."
+                        ],
+                        "duplicate_of": duplicate_of,
+                    }
+                )
+            with transaction.atomic():
+                serializer.save(author=self.request.user)
+                fingerprint.store(serializer.instance, content, duplicate_of)
+        invalidate_author_counts(self.request.user.pk)
+        suggest.ad_saved(serializer.instance)
+
+
+def visible_ads(user, queryset=None):
+    """Черновики видны только автору."""
+    queryset = Ad.objects.all() if queryset is None else queryset
+    if user.is_authenticated:
+        return queryset.filter(~Q(status=AdStatus.DRAFT) | Q(author=user))
+    return queryset.exclude(status=AdStatus.DRAFT)
 
 
 class AdDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Ad.objects.all()
-    serializer_class = AdSerializer
+    serializer_class = AdDetailSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrAdmin]
 
+    def get_queryset(self):
+        # Галерея одной страницы — одним дополнительным запросом
+        queryset = ads_with_comments().prefetch_related("images")
+        return visible_ads(self.request.user, queryset)
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        counters.record_view(response.data["id"])
+        return response
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        if {"title", "description", "image"} & set(serializer.validated_data):
+            fingerprint.refresh(serializer.instance)
+        invalidate_author_counts(serializer.instance.author_id)
+        suggest.ad_saved(serializer.instance)
+
+    def perform_destroy(self, instance):
+        # Мягкое удаление: объявление можно восстановить, пока его не
+        # перенесла в архив команда archive_ads
+        instance.soft_delete()
+        invalidate_author_counts(instance.author_id)
+        suggest.ad_deleted(instance)
+
+
+class AdGalleryMixin:
+    permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrAdmin]
+
+    def get_ad(self):
+        ad = generics.get_object_or_404(
+            visible_ads(self.request.user), pk=self.kwargs["ad_id"]
+        )
+        self.check_object_permissions(self.request, ad)
+        return ad
+
+    def check_object_permissions(self, request, obj):
+        # Права на картинку — это права на объявление, их проверяет get_ad()
+        if not isinstance(obj, AdImage):
+            super().check_object_permissions(request, obj)
+
+
+class AdImageListView(AdGalleryMixin, generics.ListCreateAPIView):
+    """Галерея объявления: список и загрузка картинок (поле images)."""
+
+    serializer_class = AdImageSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return AdImage.objects.none()
+        return self.get_ad().images.all()
+
+    def get_serializer_class(self):
+        if self.request.method == "POST":
+            return AdImageUploadSerializer
+        return AdImageSerializer
+
+    def create(self, request, *args, **kwargs):
+        ad = self.get_ad()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            images = gallery.add_images(ad, serializer.validated_data["images"])
+        except gallery.GalleryError as exc:
+            raise ValidationError({"images": [str(exc)]})
+        data = AdImageSerializer(
+            images, many=True, context=self.get_serializer_context()
+        ).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class AdImageDetailView(AdGalleryMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Картинка галереи: смена позиции (PATCH) и удаление."""
+
+    serializer_class = AdImageSerializer
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return AdImage.objects.none()
+        return self.get_ad().images.all()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        gallery.update_cover(serializer.instance.ad)
+
+    def perform_destroy(self, instance):
+        gallery.delete_image(instance)
+
+
+class AdSuggestView(APIView):
+    """Подсказки по префиксу: GET /api/ads/suggest/?q=ipho"""
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 20)
+        except ValueError:
+            raise ValidationError({"limit": "Ожидается число."})
+        query = request.query_params.get("q", "")
+        return Response(suggest.get_index().suggest(query, max(limit, 1)))
+
+
+class AdSimilarView(generics.ListAPIView):
+    """Похожие объявления из предрассчитанной таблицы AdSimilarity."""
+
+    serializer_class = AdShortSerializer
+    pagination_class = None
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        return Ad.objects.active()
+
+    def list(self, request, *args, **kwargs):
+        # Несуществующее или чужой черновик — 404, как у карточки объявления
+        generics.get_object_or_404(visible_ads(request.user), pk=self.kwargs["pk"])
+        similarity = AdSimilarity.objects.filter(ad_id=self.kwargs["pk"]).first()
+        ids = [pk for pk, _ in similarity.neighbours] if similarity else []
+        ads = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [ads[pk] for pk in ids if pk in ads], many=True
+        )
+        return Response(serializer.data)
+
+
+class AuthorAdsView(generics.ListAPIView):
+    """Активные объявления пользователя."""
+
+    serializer_class = AdShortSerializer
+    pagination_class = AuthorAdsPagination
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    count_scope = "active"
+
+    def get_author_id(self):
+        return self.kwargs["user_id"]
+
+    def get_base_queryset(self):
+        return Ad.objects.active()
+
+    def get_queryset(self):
+        return (
+            self.get_base_queryset()
+            .filter(author_id=self.get_author_id())
+            .only(*AdShortSerializer.Meta.fields)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if getattr(self, "swagger_fake_view", False):
+            return super().list(request, *args, **kwargs)
+        self.paginator.count = author_ads_count(
+            self.get_author_id(),
+            self.count_scope,
+            self.get_base_queryset().filter(author_id=self.get_author_id()),
+        )
+        return super().list(request, *args, **kwargs)
+
+
+class MyAdsView(AuthorAdsView):
+    """Все объявления текущего пользователя, включая черновики."""
+
+    permission_classes = [IsAuthenticated]
+    count_scope = "all"
+
+    def get_author_id(self):
+        return self.request.user.pk
+
+    def get_base_queryset(self):
+        return Ad.objects.all()
+
 
 class CommentListView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
@@ -37,13 +287,107 @@ class CommentListView(generics.ListCreateAPIView):
         # Исправление для Swagger
         if getattr(self, "swagger_fake_view", False):
             return Comment.objects.none()
-        ad_id = self.kwargs["ad_id"]
-        return Comment.objects.filter(ad_id=ad_id)
+        return Comment.objects.filter(ad=self.get_ad(), is_hidden=False)
+
+    def get_ad(self):
+        # Черновик и его комментарии видны только автору, как в AdDetailView
+        return generics.get_object_or_404(
+            visible_ads(self.request.user), pk=self.kwargs["ad_id"]
+        )
 
     def perform_create(self, serializer):
-        ad_id = self.kwargs["ad_id"]
-        ad = generics.get_object_or_404(Ad, id=ad_id)
+        ad = self.get_ad()
         serializer.save(author=self.request.user, ad=ad)
+        # Подписчики получают комментарий только после фиксации транзакции
+        message = dict(serializer.data)
+        transaction.on_commit(lambda: stream.publish(ad.pk, message))
+        if ad.author_id != self.request.user.pk:
+            # Письмо автору отправит run_jobs; за паузу накопится дайджест
+            jobs.enqueue_on_commit(
+                "comment_notification",
+                {"comment_id": serializer.instance.pk},
+                key=f"user:{ad.author_id}",
+                delay=settings.COMMENT_DIGEST_DELAY,
+            )
+
+
+async def comment_stream(request, ad_id):
+    """Новые комментарии объявления как Server-Sent Events.
+
+    GET /api/ads/<ad_id>/comments/stream/ — только под ASGI (config.asgi).
+    При переподключении браузер присылает Last-Event-ID, и пропущенные
+    комментарии дочитываются из базы.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    # Те же правила видимости, что у GET /api/ads/<id>/: черновик — только
+    # автору. Для /api/ сессионный request.user не заполняется, поэтому
+    # пользователь берется из JWT, если клиент передал заголовок
+    user = await sync_to_async(_stream_user)(request)
+    if not await visible_ads(user).filter(pk=ad_id).aexists():
+        raise Http404
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    stream.listen()
+    response = StreamingHttpResponse(
+        _comment_events(ad_id, last_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx не должен буферизовать поток
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _stream_user(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        result = None
+    return result[0] if result else AnonymousUser()
+
+
+async def _comment_events(ad_id, last_id):
+    subscription = stream.broker.subscribe(ad_id)
+    try:
+        yield f"retry: {settings.COMMENT_STREAM_RETRY_MS}\n\n"
+        # Пропущенное дочитывается страницами по pk до конца: новые
+        # комментарии тем временем копятся в очереди подписки
+        page_size = settings.COMMENT_STREAM_QUEUE_SIZE
+        while last_id is not None:
+            missed = Comment.objects.filter(
+                ad_id=ad_id, is_hidden=False, pk__gt=last_id
+            ).order_by("pk")[:page_size]
+            count = 0
+            async for comment in missed:
+                yield stream.format_event(CommentSerializer(comment).data)
+                last_id = comment.pk
+                count += 1
+            if count < page_size:
+                break
+
+        # Соединение ограничено по времени: если клиент ушел незаметно,
+        # подписка все равно освободится, а живой клиент переподключится
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.COMMENT_STREAM_MAX_AGE
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    min(remaining, settings.COMMENT_STREAM_HEARTBEAT),
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if message is None:
+                break
+            if last_id is not None and message["id"] <= last_id:
+                continue
+            yield stream.format_event(message)
+    finally:
+        stream.broker.unsubscribe(ad_id, subscription)
 
 
 class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -54,5 +398,188 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         # Исправление для Swagger
         if getattr(self, "swagger_fake_view", False):
             return Comment.objects.none()
-        ad_id = self.kwargs["ad_id"]
-        return Comment.objects.filter(ad_id=ad_id, id=self.kwargs["pk"])
+        return Comment.objects.filter(
+            ad__in=visible_ads(self.request.user),
+            ad_id=self.kwargs["ad_id"],
+            id=self.kwargs["pk"],
+            is_hidden=False,
+        )
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+class CommentModerationView(generics.GenericAPIView):
+    """Массовое удаление/скрытие комментариев одним запросом UPDATE/DELETE."""
+
+    serializer_class = CommentModerationSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Comment.objects.all()
+        if "ids" in data:
+            queryset = queryset.filter(pk__in=data["ids"])
+        if "author" in data:
+            queryset = queryset.filter(author_id=data["author"])
+        if "ad" in data:
+            queryset = queryset.filter(ad_id=data["ad"])
+
+        with transaction.atomic():
+            if data["action"] == "delete":
+                affected = queryset.soft_delete()
+            else:
+                affected = queryset.update(is_hidden=data["action"] == "hide")
+
+        return Response({"action": data["action"], "affected": affected})
+
+
+class CommentImportView(generics.GenericAPIView):
+    """Массовый импорт комментариев через bulk_create."""
+
+    serializer_class = CommentImportSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=settings.COMMENT_IMPORT_MAX_SIZE
+        )
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        # Проверяем ссылки двумя запросами на весь пакет, а не по одному
+        ad_ids = {item["ad"] for item in items}
+        author_ids = {item["author"] for item in items if "author" in item}
+        missing_ads = ad_ids - set(
+            Ad.objects.filter(pk__in=ad_ids).values_list("pk", flat=True)
+        )
+        missing_authors = author_ids - set(
+            User.objects.filter(pk__in=author_ids).values_list("pk", flat=True)
+        )
+        errors = {}
+        if missing_ads:
+            errors["ad"] = [
+                f"Объявление {pk} не найдено." for pk in sorted(missing_ads)
+            ]
+        if missing_authors:
+            errors["author"] = [
+                f"Пользователь {pk} не найден." for pk in sorted(missing_authors)
+            ]
+        if errors:
+            raise ValidationError(errors)
+
+        comments = [
+            Comment(
+                ad_id=item["ad"],
+                author_id=item.get("author", request.user.pk),
+                text=item["text"],
+            )
+            for item in items
+        ]
+        with transaction.atomic():
+            Comment.objects.bulk_create(comments, batch_size=500)
+
+        return Response({"created": len(comments)}, status=status.HTTP_201_CREATED)
+
+
+class PurgeJobDetailView(generics.RetrieveAPIView):
+    """Прогресс фонового удаления."""
+
+    queryset = PurgeJob.objects.all()
+    serializer_class = PurgeJobSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadCreateView(generics.CreateAPIView):
+    """Начало загрузки картинки по частям: POST /api/uploads/"""
+
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.instance = uploads.start(
+            self.request.user, **serializer.validated_data
+        )
+
+
+class UploadDetailView(generics.RetrieveAPIView):
+    """Состояние загрузки (GET) и прием очередной части (PUT).
+
+    Часть передается телом запроса с заголовками
+    Content-Range: bytes <start>-<end>/<size> и X-Chunk-SHA256. При 409
+    клиент продолжает с offset из ответа.
+    """
+
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ChunkedUpload.objects.none()
+        return ChunkedUpload.objects.filter(user=self.request.user)
+
+    def put(self, request, *args, **kwargs):
+        upload = self.get_object()
+        match = CONTENT_RANGE_RE.match(request.headers.get("Content-Range", ""))
+        checksum = request.headers.get("X-Chunk-SHA256", "")
+        if not match or not checksum:
+            raise ValidationError(
+                {"detail": "Нужны заголовки Content-Range и X-Chunk-SHA256."}
+            )
+        start, end, size = map(int, match.groups())
+        length = end - start + 1
+        if size != upload.size or length <= 0:
+            raise ValidationError({"detail": "Content-Range не совпадает с загрузкой."})
+        try:
+            content_length = int(request.headers.get("Content-Length") or 0)
+        except ValueError:
+            content_length = None
+        if content_length != length:
+            raise ValidationError(
+                {"detail": "Длина тела не совпадает с Content-Range."}
+            )
+        try:
+            # Тело читается потоком, request.data не используется
+            uploads.write_chunk(upload, request.stream, start, length, checksum)
+        except uploads.UploadError as exc:
+            return Response(
+                {"detail": str(exc), "offset": exc.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(self.get_serializer(upload).data)
+
+
+class UploadCompleteView(generics.GenericAPIView):
+    """Завершение загрузки: файл становится картинкой объявления."""
+
+    serializer_class = UploadCompleteSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ChunkedUpload.objects.none()
+        return ChunkedUpload.objects.filter(user=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        upload = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ad = generics.get_object_or_404(
+            Ad, pk=serializer.validated_data["ad"], author=request.user
+        )
+        try:
+            uploads.complete(upload, ad)
+        except uploads.UploadError as exc:
+            return Response(
+                {"detail": str(exc), "offset": exc.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+        fingerprint.refresh(ad)
+        invalidate_author_counts(ad.author_id)
+        return Response(AdSerializer(ad, context=self.get_serializer_context()).data)
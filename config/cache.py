@@ -0,0 +1,89 @@
+# config/cache.py
+import secrets
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+_MISSING = object()
+
+
+class TieredCache:
+    """Чтение и запись через два уровня кеша: локальный L1 и общий L2.
+
+    Каждая запись получает случайную версию. В L2 под ключом лежит пара
+    (версия, значение), а под "<ключ>:version" — только версия; L1 хранит
+    ту же пару. get берет значение из L1, лишь если его версия совпадает с
+    текущей в L2: это один короткий запрос вместо передачи и распаковки
+    всего значения. Поэтому set и delete в любом воркере сразу видны
+    остальным, а CACHE_LOCAL_TIMEOUT ограничивает только память L1.
+    Ограничители частоты и сжатые ответы работают напрямую с общим
+    "default".
+    """
+
+    def __init__(self, local_alias="local", shared_alias="default"):
+        self.local_alias = local_alias
+        self.shared_alias = shared_alias
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @staticmethod
+    def _version_key(key):
+        return f"{key}:version"
+
+    def _local_timeout(self, timeout):
+        local_timeout = self.local.default_timeout
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return local_timeout
+        return min(timeout, local_timeout)
+
+    def get(self, key, default=None):
+        version = self.shared.get(self._version_key(key))
+        if version is None:
+            return default
+        entry = self.local.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        entry = self.shared.get(key)
+        if entry is None:
+            return default
+        self.local.set(key, entry)
+        return entry[1]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        entry = (secrets.token_hex(8), value)
+        # Сначала значение, потом версия: прочитавший новую версию найдет и
+        # новое значение
+        self.shared.set(key, entry, timeout)
+        self.shared.set(self._version_key(key), entry[0], timeout)
+        self.local.set(key, entry, self._local_timeout(timeout))
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        """Как cache.get_or_set: default может быть функцией, она вызывается
+        только при промахе в обоих уровнях."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout)
+        return value
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        # Без версии в L2 копии в L1 всех воркеров считаются устаревшими
+        self.shared.delete_many([self._version_key(key) for key in keys] + keys)
+        self.local.delete_many(keys)
+
+    def clear(self):
+        self.shared.clear()
+        self.local.clear()
+
+
+tiered = TieredCache()
@@ -0,0 +1,156 @@
+# config/middleware.py
+"""Промежуточные слои проекта."""
+
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import caches
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _codecs():
+    codecs = {}
+    if brotli is not None:
+        codecs["br"] = lambda data: brotli.compress(data, quality=5)
+    if zstandard is not None:
+        codecs["zstd"] = lambda data: zstandard.ZstdCompressor(level=3).compress(data)
+    codecs["gzip"] = lambda data: gzip.compress(data, compresslevel=6, mtime=0)
+    return codecs
+
+
+# В порядке предпочтения сервера: br и zstd сжимают лучше и быстрее gzip
+CODECS = _codecs()
+
+
+def negotiate(accept_encoding):
+    """Лучшая из доступных кодировок, разрешенных заголовком Accept-Encoding."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0)
+    for name in CODECS:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """Сжатие ответов br/zstd/gzip по Accept-Encoding.
+
+    Сжимаются ответы не короче COMPRESSION_MIN_SIZE байт с типом из
+    COMPRESSION_CONTENT_TYPES на путях COMPRESSION_PATH_PREFIXES.
+    Сжатые байты кешируются по хешу исходного тела: популярная страница
+    сжимается один раз, а на повторных запросах считается только хеш.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or response.status_code != 200
+            or not request.path.startswith(settings.COMPRESSION_PATH_PREFIXES)
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or not response.get("Content-Type", "").startswith(
+                settings.COMPRESSION_CONTENT_TYPES
+            )
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        if response.has_header("ETag"):
+            # Слабый ETag: сжатое представление отличается побайтно
+            response["ETag"] = "W/" + response["ETag"].removeprefix("W/")
+        return response
+
+
+def compressed_key(content, encoding):
+    """Ключ кеша сжатых байт: кодировка и хеш тела."""
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return f"compressed:{encoding}:{digest}"
+
+
+def compress(content, encoding):
+    """Сжатые байты content; готовый результат берется из кеша."""
+    if len(content) > settings.COMPRESSION_CACHE_MAX_SIZE:
+        return CODECS[encoding](content)
+    key = compressed_key(content, encoding)
+    cache = caches[settings.COMPRESSION_CACHE]
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = CODECS[encoding](content)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+class PathScopedMixin:
+    """Пропускает слой для путей из LEAN_MIDDLEWARE_PREFIXES.
+
+    API аутентифицируется только JWT, поэтому сессия, CSRF, сообщения и
+    request.user из сессии ему не нужны. Классы ниже — наследники
+    стандартных, так что проверки админки (admin.E408–E410) проходят, а
+    /admin/ работает как раньше. Годится и для ASGI: в асинхронном режиме
+    get_response и родительский __call__ возвращают корутину.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(settings.LEAN_MIDDLEWARE_PREFIXES):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class LeanSessionMiddleware(PathScopedMixin, SessionMiddleware):
+    pass
+
+
+class LeanCsrfViewMiddleware(PathScopedMixin, CsrfViewMiddleware):
+    pass
+
+
+class LeanAuthenticationMiddleware(PathScopedMixin, AuthenticationMiddleware):
+    pass
+
+
+class LeanMessageMiddleware(PathScopedMixin, MessageMiddleware):
+    pass
+
+
+class LeanXFrameOptionsMiddleware(PathScopedMixin, XFrameOptionsMiddleware):
+    pass
@@ -3,12 +3,20 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("SECRET_KEY", "django-insecure-test-key-123")
 DEBUG = os.getenv("DEBUG", "True") == "True"
 ALLOWED_HOSTS = ["*"]
 
+# Админка и Swagger/ReDoc: на чисто API-узлах их выключают, чтобы не платить
+# за импорт и регистрацию при старте воркера. URL подключаются лениво
+# (config/urls.py), профиль старта — manage.py importtime.
+ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", "True") == "True"
+API_DOCS_ENABLED = os.getenv("API_DOCS_ENABLED", "True") == "True"
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -26,17 +34,28 @@ INSTALLED_APPS = [
     "users",
     "ads",
 ]
+if not ADMIN_ENABLED:
+    INSTALLED_APPS.remove("django.contrib.admin")
+if not API_DOCS_ENABLED:
+    INSTALLED_APPS.remove("drf_yasg")
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.middleware.CompressionMiddleware",
+    "config.middleware.LeanSessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.middleware.LeanCsrfViewMiddleware",
+    "config.middleware.LeanAuthenticationMiddleware",
+    "config.middleware.LeanMessageMiddleware",
+    "config.middleware.LeanXFrameOptionsMiddleware",
 ]
+# Пути, для которых пропускаются сессия, CSRF, request.user из сессии,
+# сообщения и X-Frame-Options (API работает только с JWT). Пустой кортеж
+# (LEAN_API_MIDDLEWARE=False) возвращает полный стек для всех путей
+LEAN_MIDDLEWARE_PREFIXES = (
+    ("/api/",) if os.getenv("LEAN_API_MIDDLEWARE", "True") == "True" else ()
+)
 
 ROOT_URLCONF = "config.urls"
 
@@ -66,6 +85,58 @@ DATABASES = {
     }
 }
 
+# Кеш в два уровня (config.cache): "local" — LRU в памяти процесса с
+# ограничением числа ключей, "default" — общий для всех воркеров (file по
+# умолчанию, memcached или redis; locmem — только для тестов, его не видят
+# другие воркеры). Ключи
+# разведены по версии развертывания, поэтому новый релиз не читает значения
+# в формате старого.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "")
+CACHE_KEY_PREFIX = "ads:" + os.getenv("DEPLOY_VERSION", "dev")
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000"))
+# Сколько значение живет в L1. Актуальность L1 проверяется по версии в L2
+# (config.cache), так что таймаут ограничивает лишь память, а не устаревание
+CACHE_LOCAL_TIMEOUT = int(os.getenv("CACHE_LOCAL_TIMEOUT", "5"))
+
+_SHARED_CACHES = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "shared"),
+    "file": (
+        "django.core.cache.backends.filebased.FileBasedCache",
+        "/var/tmp/ads_cache",
+    ),
+    "memcached": (
+        "django.core.cache.backends.memcached.PyMemcacheCache",
+        "127.0.0.1:11211",
+    ),
+    "redis": (
+        "django.core.cache.backends.redis.RedisCache",
+        "redis://127.0.0.1:6379/1",
+    ),
+}
+if CACHE_BACKEND not in _SHARED_CACHES:
+    raise ImproperlyConfigured(
+        f"Неизвестный CACHE_BACKEND {CACHE_BACKEND!r}, "
+        f"допустимо: {', '.join(_SHARED_CACHES)}"
+    )
+_backend, _location = _SHARED_CACHES[CACHE_BACKEND]
+CACHES = {
+    "default": {
+        "BACKEND": _backend,
+        "LOCATION": CACHE_LOCATION or _location,
+        "KEY_PREFIX": CACHE_KEY_PREFIX,
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "local",
+        "KEY_PREFIX": CACHE_KEY_PREFIX,
+        "TIMEOUT": CACHE_LOCAL_TIMEOUT,
+        # LocMemCache вытесняет самые давние по обращению ключи; при
+        # переполнении уходит 1/CULL_FREQUENCY из них
+        "OPTIONS": {"MAX_ENTRIES": CACHE_LOCAL_MAX_ENTRIES, "CULL_FREQUENCY": 10},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -81,6 +152,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Политика хеширования паролей: "pbkdf2" (по умолчанию) или "argon2".
+# Старые хеши по-прежнему проверяются и пересчитываются при входе.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+
+PASSWORD_HASHERS = [
+    "users.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if PASSWORD_HASHER == "argon2":
+    # Пакет argon2-cffi — в зависимостях pyproject.toml
+    PASSWORD_HASHERS.remove("django.contrib.auth.hashers.Argon2PasswordHasher")
+    PASSWORD_HASHERS.insert(0, "django.contrib.auth.hashers.Argon2PasswordHasher")
+
 LANGUAGE_CODE = "ru-ru"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -135,13 +223,25 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 4,
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # Скользящее окно для /api/token/ (users.throttling)
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.getenv("LOGIN_THROTTLE_IP", "60/min"),
+        "login_email": os.getenv("LOGIN_THROTTLE_EMAIL", "10/min"),
+    },
+    # Сколько доверенных прокси стоит перед приложением. По умолчанию 0:
+    # X-Forwarded-For присылает сам клиент, и IP берется из REMOTE_ADDR.
+    # За nginx (NUM_PROXIES=1) IP клиента — последний адрес в заголовке,
+    # который добавил сам nginx
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-    "ROTATE_REFRESH_TOKENS": False,
+    # Ротация с отзывом через users.revocation, стандартный blacklist не нужен
+    "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": False,
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.RotatingTokenRefreshSerializer",
     "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
@@ -164,6 +264,111 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 }
 
+# Хранилище отозванных refresh-токенов
+JWT_REVOCATION_LRU_SIZE = 10000
+
+# Максимальный размер пакета для /api/comments/import/
+COMMENT_IMPORT_MAX_SIZE = 5000
+
+# Размер пачки фонового удаления (команда purge_deleted)
+PURGE_BATCH_SIZE = 1000
+# Аренда задания purge_deleted, секунд: продлевается после каждой пачки, по
+# истечении задание может забрать другой запуск
+PURGE_LEASE_SECONDS = 600
+# Через сколько дней удаленные объявления/комментарии уходят в архив
+ARCHIVE_TOMBSTONES_AFTER_DAYS = int(os.getenv("ARCHIVE_TOMBSTONES_AFTER_DAYS", "30"))
+# Срок публикации объявления; просроченные переводит в expired команда expire_ads
+ADS_LIFETIME_DAYS = int(os.getenv("ADS_LIFETIME_DAYS", "30"))
+# Горячее окно: проданные и истекшие объявления старше уходят в архив
+# (0 — не переносить). Активные переносятся только с archive_ads
+# --include-active: вернуть объявление из архива нельзя
+ADS_HOT_RETENTION_DAYS = int(os.getenv("ADS_HOT_RETENTION_DAYS", "180"))
+# Срок хранения архива (0 — бессрочно)
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+
+# Поиск объявлений рядом (?near=lat,lng&radius=км)
+ADS_NEAR_DEFAULT_RADIUS_KM = 10
+ADS_NEAR_MAX_RADIUS_KM = 200
+
+# Отложенная запись счетчиков просмотров (ads.counters); 0 — без фонового потока
+ADS_VIEWS_FLUSH_INTERVAL = int(os.getenv("ADS_VIEWS_FLUSH_INTERVAL", "10"))
+ADS_VIEWS_FLUSH_BATCH_SIZE = 500
+
+# Рейтинг trending (команда update_trending): период полураспада и веса событий
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_COMMENT_WEIGHT = 5.0
+TRENDING_VIEW_WEIGHT = 1.0
+
+# Похожие объявления (команда build_similar_ads)
+SIMILAR_ADS_K = 10
+SIMILAR_ADS_MIN_SCORE = 0.1
+SIMILAR_ADS_BLOCK_SIZE = 2000
+
+# Почти одинаковые объявления при создании: reject — отклонять (400),
+# flag — публиковать с пометкой AdFingerprint.duplicate_of, off — не проверять
+ADS_DUPLICATE_POLICY = os.getenv("ADS_DUPLICATE_POLICY", "flag")
+
+# SSE-поток комментариев (ads.stream): пустой COMMENT_STREAM_REDIS_URL —
+# рассылка внутри воркера, иначе через Redis pub/sub между воркерами
+COMMENT_STREAM_REDIS_URL = os.getenv("COMMENT_STREAM_REDIS_URL", "")
+COMMENT_STREAM_QUEUE_SIZE = 100
+COMMENT_STREAM_HEARTBEAT = 15
+COMMENT_STREAM_MAX_AGE = 300
+COMMENT_STREAM_RETRY_MS = 3000
+
+# Очередь фоновых заданий (ads.jobs, команда run_jobs)
+JOBS_BATCH_SIZE = 100
+JOBS_POLL_INTERVAL = 2
+JOBS_LEASE_SECONDS = 300
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 30
+# Пауза перед письмом о комментарии: следующие попадут в тот же дайджест
+COMMENT_DIGEST_DELAY = int(os.getenv("COMMENT_DIGEST_DELAY", 60))
+
+# Загрузка картинок по частям (ads.uploads): каталог недокачанных файлов,
+# максимальный размер части и файла, срок хранения брошенных загрузок
+CHUNKED_UPLOAD_DIR = os.getenv(
+    "CHUNKED_UPLOAD_DIR", os.path.join(BASE_DIR, "uploads_tmp")
+)
+CHUNKED_UPLOAD_CHUNK_SIZE = 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRE_HOURS = 24
+
+# Галерея объявления (ads.gallery)
+ADS_GALLERY_MAX_IMAGES = 10
+ADS_GALLERY_UPLOAD_WORKERS = 4
+ADS_THUMBNAIL_SIZE = (320, 320)
+
+# Медиа через ads.media.serve_media: за nginx файл отдается по
+# X-Accel-Redirect на internal-location MEDIA_ACCEL_PREFIX
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "False") == "True"
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Файлы с этими префиксами доступны только после входа
+MEDIA_PROTECTED_PREFIXES = ()
+
+# Сжатие ответов (config.middleware): br и zstd — если установлены пакеты
+# brotli и zstandard, gzip есть всегда. Сжатые байты кешируются по хешу тела.
+# Сжимается только JSON API: он авторизуется заголовком, а не cookie, и
+# не уязвим к BREACH. HTML админки (сессия и CSRF-токен в теле) не сжимается
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_PATH_PREFIXES = ("/api/",)
+COMPRESSION_CONTENT_TYPES = ("application/json",)
+COMPRESSION_CACHE = "default"
+COMPRESSION_CACHE_MAX_SIZE = 1024 * 1024
+COMPRESSION_CACHE_TIMEOUT = 300
+
+# gc_media не трогает файлы моложе этого срока, часов
+MEDIA_GC_GRACE_HOURS = 24
+
+# Подсказки поиска: период полной пересборки индекса в воркере, секунд
+SUGGEST_REFRESH_SECONDS = 300
+
+# Время жизни закешированного числа объявлений автора, секунд
+AUTHOR_ADS_COUNT_TIMEOUT = 300
+
+# Покрывающие индексы (INCLUDE) применяются только на PostgreSQL
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Email settings
@@ -178,3 +383,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Медиафайлы именуются по хешу содержимого (ads.storage); filesystem —
+# прежние имена по upload_to
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "cas")
+STORAGES = {
+    "default": {
+        "BACKEND": (
+            "ads.storage.ContentAddressedStorage"
+            if MEDIA_STORAGE == "cas"
+            else "django.core.files.storage.FileSystemStorage"
+        ),
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
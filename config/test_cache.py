@@ -0,0 +1,98 @@
+import os
+import runpy
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from config.cache import tiered
+
+
+class TieredCacheTests(SimpleTestCase):
+    """Тесты двухуровневого кеша"""
+
+    def setUp(self):
+        tiered.clear()
+
+    def tearDown(self):
+        tiered.clear()
+
+    def test_get_warms_local_from_shared(self):
+        tiered.set("key", 1)
+        caches["local"].clear()
+        self.assertEqual(tiered.get("key"), 1)
+        self.assertEqual(caches["local"].get("key")[1], 1)
+
+        # Дальше значение читается из L1, из L2 — только версия
+        with mock.patch.object(
+            caches["default"], "get", wraps=caches["default"].get
+        ) as shared_get:
+            self.assertEqual(tiered.get("key"), 1)
+        self.assertEqual(
+            [call.args[0] for call in shared_get.call_args_list], ["key:version"]
+        )
+
+    def test_set_and_delete_go_through_both_tiers(self):
+        tiered.set("key", 0)
+        self.assertEqual(caches["default"].get("key")[1], 0)
+        self.assertEqual(caches["local"].get("key")[1], 0)
+
+        tiered.delete_many(["key"])
+        self.assertIsNone(caches["default"].get("key"))
+        self.assertIsNone(caches["default"].get("key:version"))
+        self.assertIsNone(caches["local"].get("key"))
+        self.assertEqual(tiered.get("key", "нет"), "нет")
+
+    def test_other_workers_changes_invalidate_local(self):
+        tiered.set("key", 1)
+        stale = caches["local"].get("key")
+
+        # Другой воркер перезаписал ключ: в L1 этого процесса осталась копия
+        tiered.set("key", 2)
+        caches["local"].set("key", stale)
+        self.assertEqual(tiered.get("key"), 2)
+
+        # ...и удалил его
+        tiered.delete("key")
+        caches["local"].set("key", stale)
+        self.assertIsNone(tiered.get("key"))
+
+    def test_unknown_backend_is_configuration_error(self):
+        with mock.patch.dict(os.environ, CACHE_BACKEND="unknown"):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_path(settings.BASE_DIR / "config" / "settings.py")
+
+    def test_get_or_set_calls_default_only_on_miss(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None  # None — тоже значение, а не промах
+
+        self.assertIsNone(tiered.get_or_set("key", compute, 60))
+        self.assertIsNone(tiered.get_or_set("key", compute, 60))
+        self.assertEqual(len(calls), 1)
+
+    def test_keys_are_namespaced_by_deploy_version(self):
+        for alias in ("default", "local"):
+            self.assertTrue(
+                caches[alias].make_key("key").startswith(settings.CACHE_KEY_PREFIX)
+            )
+
+    def test_local_tier_evicts_least_recently_used(self):
+        local = dict(
+            settings.CACHES["local"],
+            OPTIONS={"MAX_ENTRIES": 10, "CULL_FREQUENCY": 10},
+        )
+        with override_settings(CACHES=dict(settings.CACHES, local=local)):
+            for i in range(10):
+                tiered.set(f"key{i}", i)
+            tiered.get("key0")
+            tiered.set("key10", 10)
+
+            self.assertEqual(caches["local"].get("key0")[1], 0)
+            self.assertIsNone(caches["local"].get("key1"))
+            # Из L1 вытеснен, но в общем кеше остался
+            self.assertEqual(tiered.get("key1"), 1)
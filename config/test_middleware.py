@@ -0,0 +1,85 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ads.models import Ad
+from config import middleware
+from users.models import User
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Тесты сжатия ответов"""
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email="gz@example.com", password="pass")
+        Ad.objects.bulk_create(
+            Ad(
+                title=f"Объявление {i}",
+                description="Описание " * 20,
+                price=i,
+                author=user,
+            )
+            for i in range(10)
+        )
+
+    def test_negotiate(self):
+        with mock.patch.dict(middleware.CODECS, {"gzip": gzip.compress}, clear=True):
+            self.assertEqual(middleware.negotiate("gzip, deflate"), "gzip")
+            self.assertEqual(middleware.negotiate("br;q=1, gzip;q=0"), None)
+            self.assertEqual(middleware.negotiate("*"), "gzip")
+            self.assertIsNone(middleware.negotiate(""))
+        with mock.patch.dict(
+            middleware.CODECS, {"br": bytes, "gzip": gzip.compress}, clear=True
+        ):
+            self.assertEqual(middleware.negotiate("gzip, br"), "br")
+
+    def test_compresses_and_caches_by_content(self):
+        plain = self.client.get(reverse("ad-list"))
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        with mock.patch.object(
+            middleware, "CODECS", {"gzip": mock.Mock(wraps=gzip.compress)}
+        ) as codecs:
+            first = self.client.get(reverse("ad-list"), HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(reverse("ad-list"), HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(codecs["gzip"].call_count, 1)
+
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertLess(len(first.content), len(plain.content))
+        self.assertEqual(gzip.decompress(second.content), plain.content)
+
+    def test_html_outside_api_untouched(self):
+        # Страница с CSRF-токеном: сжатие открыло бы ее для BREACH
+        response = self.client.get("/admin/login/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertGreater(len(response.content), 1024)
+        self.assertNotIn("Content-Encoding", response)
+
+    @override_settings(COMPRESSION_MIN_SIZE=10**6)
+    def test_small_responses_untouched(self):
+        response = self.client.get(reverse("ad-list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+
+
+class LeanMiddlewareTests(TestCase):
+    """Тесты облегченного стека middleware для API"""
+
+    def test_api_skips_session_layers(self):
+        response = self.client.get(reverse("ad-list"))
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertNotIn("X-Frame-Options", response)
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get("/admin/login/")
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.assertIn("csrftoken", response.cookies)
+
+    @override_settings(LEAN_MIDDLEWARE_PREFIXES=())
+    def test_profile_can_be_disabled(self):
+        response = self.client.get(reverse("ad-list"))
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
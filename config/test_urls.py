@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+from django.urls import Resolver404, get_resolver, resolve, reverse
+
+from ads.management.commands.importtime import parse_importtime
+from config.urls import lazy_include
+
+
+class LazyIncludeTests(SimpleTestCase):
+    """Тесты ленивого подключения URLconf"""
+
+    def test_module_imported_on_first_match(self):
+        resolver = lazy_include("missing/", "config.no_such_urls")
+        # Пока запрос не дошел до маршрута, модуль не импортируется
+        with self.assertRaises(Resolver404):
+            resolver.resolve("other/")
+        with self.assertRaises(ModuleNotFoundError):
+            resolver.resolve("missing/page/")
+
+    def test_docs_and_admin_still_routed(self):
+        self.assertEqual(resolve("/docs/swagger/").url_name, "schema-swagger-ui")
+        self.assertEqual(reverse("schema-json"), "/docs/swagger.json")
+        # Несовпавшие пути не доходят до документации
+        self.assertEqual(str(get_resolver().url_patterns[-1].pattern), "docs/")
+        self.assertEqual(reverse("admin:index"), "/admin/")
+        self.assertEqual(resolve("/api/ads/").url_name, "ad-list")
+
+    def test_old_docs_paths_redirect(self):
+        response = self.client.get("/swagger/")
+        self.assertRedirects(
+            response, "/docs/swagger/", status_code=301, fetch_redirect_response=False
+        )
+        response = self.client.get("/swagger.json?format=openapi")
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], "/docs/swagger.json?format=openapi")
+
+
+class ImportTimeTests(SimpleTestCase):
+    """Тесты разбора вывода -X importtime"""
+
+    def test_parse(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _io\n"
+            "import time:       300 |        420 |   io\n"
+            "import time:        50 |        470 | config\n"
+            "Traceback: not a timing line\n"
+        )
+        self.assertEqual(
+            parse_importtime(stderr),
+            [("_io", 120, 120, 2), ("io", 300, 420, 1), ("config", 50, 470, 0)],
+        )
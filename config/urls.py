@@ -1,35 +1,51 @@
 # config/urls.py
-from django.contrib import admin
 from django.urls import path, include
+from django.views.generic import RedirectView
+from django.urls.resolvers import RoutePattern, URLResolver
 from django.conf import settings
-from django.conf.urls.static import static
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from django.views.decorators.csrf import csrf_exempt
+from ads.media import serve_media
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Ads API",
-        default_version="v1",
-        description="API для сайта объявлений",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
 
-urlpatterns = [
-    # Swagger/ReDoc документация
-    path('swagger.json', csrf_exempt(schema_view.without_ui(cache_timeout=0)), name='schema-json'),
-    path('swagger.yaml', csrf_exempt(schema_view.without_ui(cache_timeout=0)), name='schema-yaml'),
-    path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+def lazy_include(route, urlconf, namespace=None):
+    """Как path(route, include(urlconf)), но модуль импортируется при первом
+    обращении к маршруту, а не при загрузке корневого URLconf.
+
+    URLResolver со строкой вместо модуля импортирует его сам по требованию.
+    Ставить такие маршруты нужно после API: резолвер перебирает шаблоны по
+    порядку, и запросы к /api/ до ленивых модулей не доходят.
+    """
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf,
+        app_name=namespace,
+        namespace=namespace,
+    )
+
 
+urlpatterns = [
     # API эндпоинты - ВАЖНО: path("api/", include("users.urls")) уже включает users.urls
-    path("admin/", admin.site.urls),
     path("api/", include("users.urls")),      # Это включает ВСЕ users URLs
     path("api/", include("ads.urls")),        # Это включает ВСЕ ads URLs
+
+    # Медиа с проверкой доступа; в продакшене байты отдает nginx
+    path(settings.MEDIA_URL.lstrip("/") + "<path:name>", serve_media, name="media"),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Админка и Swagger/ReDoc грузятся лениво и отключаются на API-узлах
+if settings.ADMIN_ENABLED:
+    urlpatterns.append(lazy_include("admin/", "config.urls_admin", namespace="admin"))
+if settings.API_DOCS_ENABLED:
+    # Старые адреса документации остаются рабочими: постоянный редирект
+    # под docs/ с сохранением query string (?format=openapi)
+    urlpatterns += [
+        path(
+            old,
+            RedirectView.as_view(
+                url="/docs/" + old, permanent=True, query_string=True
+            ),
+        )
+        for old in ("swagger.json", "swagger.yaml", "swagger/", "redoc/")
+    ]
+    # Под своим префиксом: с пустым любой 404 доходил бы до этого резолвера
+    # и импортировал drf_yasg
+    urlpatterns.append(lazy_include("docs/", "config.urls_docs"))
@@ -0,0 +1,6 @@
+# config/urls_admin.py
+# URL админки. Подключается лениво из config/urls.py: get_urls() обходит все
+# зарегистрированные ModelAdmin и тянет формы и представления админки.
+from django.contrib import admin
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,25 @@
+# config/urls_docs.py
+# Swagger/ReDoc. Подключается лениво из config/urls.py: drf_yasg и сборка
+# schema_view нужны только тем, кто открывает документацию.
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from drf_yasg import openapi
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+schema_view = get_schema_view(
+    openapi.Info(
+        title="Ads API",
+        default_version="v1",
+        description="API для сайта объявлений",
+    ),
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+urlpatterns = [
+    path('swagger.json', csrf_exempt(schema_view.without_ui(cache_timeout=0)), name='schema-json'),
+    path('swagger.yaml', csrf_exempt(schema_view.without_ui(cache_timeout=0)), name='schema-yaml'),
+    path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
+    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+]
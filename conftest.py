@@ -0,0 +1,29 @@
+import pytest
+from django.core.cache import caches
+
+from ads import counters, suggest
+
+_TEST_SHARED_CACHE = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "shared",
+}
+
+
+@pytest.fixture(autouse=True)
+def _ad_views_buffer(settings):
+    """Без фонового сброса просмотров; буферы, индексы и L1-кеш воркера — с нуля.
+
+    Общий кеш в тестах — locmem, а не файловый кеш по умолчанию.
+    """
+    settings.ADS_VIEWS_FLUSH_INTERVAL = 0
+    settings.CACHES = {
+        **settings.CACHES,
+        "default": {**settings.CACHES["default"], **_TEST_SHARED_CACHE},
+    }
+    counters.clear()
+    suggest.reset()
+    caches["local"].clear()
+    yield
+    counters.clear()
+    suggest.reset()
+    caches["local"].clear()
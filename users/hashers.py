@@ -0,0 +1,16 @@
+# users/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 с числом итераций из настройки PASSWORD_HASH_ITERATIONS.
+
+    Алгоритм тот же (pbkdf2_sha256), поэтому существующие хеши проверяются
+    как обычно, а при расхождении числа итераций Django сам пересчитывает
+    хеш при следующем успешном входе (must_update).
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
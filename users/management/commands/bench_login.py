@@ -0,0 +1,43 @@
+# users/management/commands/bench_login.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Замер пропускной способности входа (логинов в секунду на ядро)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--iterations", type=int, default=50)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        credentials = {"email": "bench-login@example.com", "password": "BenchPass123"}
+
+        # Временный пользователь удаляется откатом транзакции
+        with transaction.atomic():
+            User.objects.create_user(**credentials)
+            # Первый вход может пересчитать хеш под текущую политику
+            self._login(credentials)
+
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            for _ in range(iterations):
+                self._login(credentials)
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Итераций: {iterations}")
+        self.stdout.write(f"Время: {wall:.3f} с, CPU: {cpu:.3f} с")
+        self.stdout.write(f"Логинов в секунду на ядро: {iterations / cpu:.1f}")
+
+    def _login(self, credentials):
+        serializer = TokenObtainPairSerializer(data=credentials)
+        if not serializer.is_valid():
+            raise RuntimeError(serializer.errors)
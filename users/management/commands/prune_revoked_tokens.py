@@ -0,0 +1,15 @@
+# users/management/commands/prune_revoked_tokens.py
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_expired
+
+
+class Command(BaseCommand):
+    help = "Удаляет из хранилища отзыва записи об истекших refresh-токенах"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = prune_expired(options["batch_size"])
+        self.stdout.write(f"Удалено записей: {deleted}")
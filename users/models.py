@@ -69,3 +69,21 @@ class User(AbstractUser):
     @property
     def is_admin(self):
         return self.role == UserRoles.ADMIN or self.is_superuser
+
+
+class RevokedToken(models.Model):
+    """Отозванный refresh-токен.
+
+    Хранится только jti и срок действия: после истечения токен и так
+    невалиден, поэтому строка удаляется при очистке.
+    """
+
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Отозванный токен"
+        verbose_name_plural = "Отозванные токены"
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,86 @@
+# users/revocation.py
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+_lock = threading.Lock()
+# LRU недавно найденных отозванных jti: повторные попытки с украденным
+# токеном отсекаются без обращения к БД. Отзыв необратим, поэтому
+# положительный результат безопасно держать в памяти процесса.
+_recent = OrderedDict()
+
+
+def _remember(jti):
+    with _lock:
+        _recent[jti] = True
+        _recent.move_to_end(jti)
+        while len(_recent) > settings.JWT_REVOCATION_LRU_SIZE:
+            _recent.popitem(last=False)
+
+
+def _recently_revoked(jti):
+    with _lock:
+        if jti in _recent:
+            _recent.move_to_end(jti)
+            return True
+    return False
+
+
+def is_revoked(jti):
+    """Проверяет jti: сначала LRU, затем поиск по первичному ключу."""
+    if _recently_revoked(jti):
+        return True
+    if RevokedToken.objects.filter(jti=jti).exists():
+        _remember(jti)
+        return True
+    return False
+
+
+def revoke(jti, exp):
+    """Отзывает токен. Возвращает False, если он уже был отозван.
+
+    Повторный отзыв ловится конфликтом первичного ключа, так что отдельная
+    проверка is_revoked перед ним не нужна.
+    """
+    if _recently_revoked(jti):
+        return False
+    expires_at = datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        _remember(jti)
+        return False
+    _remember(jti)
+    return True
+
+
+def prune_expired(batch_size=1000):
+    """Удаляет записи об уже истекших токенах пачками по batch_size.
+
+    Вызывается командой prune_revoked_tokens, а не из запросов: каждая
+    пачка — короткий DELETE, не блокирующий таблицу надолго.
+    """
+    now = timezone.now()
+    total = 0
+    while True:
+        batch = list(
+            RevokedToken.objects.filter(expires_at__lt=now).values_list(
+                "jti", flat=True
+            )[:batch_size]
+        )
+        if not batch:
+            return total
+        deleted, _ = RevokedToken.objects.filter(jti__in=batch).delete()
+        total += deleted
+
+
+def clear_local_cache():
+    with _lock:
+        _recent.clear()
@@ -1,6 +1,11 @@
 # users/serializers.py
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from . import revocation
 from .models import User
 
 
@@ -32,3 +37,35 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     new_password = serializers.CharField(
         write_only=True, validators=[validate_password]
     )
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Обновление токена с ротацией и отзывом старого refresh.
+
+    Вместо стандартного token_blacklist использует компактное хранилище
+    users.revocation: только jti неистекших токенов.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        jti = refresh[api_settings.JTI_CLAIM]
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Вставка по первичному ключу атомарна: из двух одновременных
+            # обновлений одним токеном успешным будет только одно, а
+            # повторное использование отозванного ловится тем же конфликтом
+            # без отдельного SELECT
+            if not revocation.revoke(jti, refresh["exp"]):
+                raise TokenError(_("Token is blacklisted"))
+        elif revocation.is_revoked(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
@@ -0,0 +1,95 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from users.models import User
+from users.throttling import LoginEmailThrottle, LoginIPThrottle
+
+
+class LoginThrottleTests(APITestCase):
+    """Тесты ограничения частоты входа и политики хеширования"""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("token_obtain_pair")
+        self.user = User.objects.create_user(
+            email="throttle@example.com", password="ThrottlePass123"
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_email_bucket_rejects_flood_before_hashing(self):
+        """После исчерпания корзины пароль уже не проверяется"""
+        data = {"email": "throttle@example.com", "password": "wrong"}
+        with mock.patch.object(LoginEmailThrottle, "get_rate", return_value="3/min"):
+            for _ in range(3):
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+            with mock.patch("django.contrib.auth.backends.ModelBackend.authenticate") as auth:
+                response = self.client.post(self.url, data, format="json")
+                auth.assert_not_called()
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    def test_bucket_is_per_email(self):
+        """Флуд по одному email не блокирует другой"""
+        with mock.patch.object(LoginEmailThrottle, "get_rate", return_value="1/min"):
+            self.client.post(self.url, {"email": "a@example.com", "password": "x"})
+            response = self.client.post(
+                self.url,
+                {"email": "throttle@example.com", "password": "ThrottlePass123"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        """Без доверенных прокси подмена X-Forwarded-For не обходит лимит по IP"""
+        with mock.patch.object(LoginIPThrottle, "get_rate", return_value="2/min"):
+            for i in range(3):
+                response = self.client.post(
+                    self.url,
+                    {"email": f"user{i}@example.com", "password": "x"},
+                    format="json",
+                    HTTP_X_FORWARDED_FOR=f"10.0.0.{i}",
+                )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_rehash_on_login_after_iterations_change(self):
+        """Хеш пересчитывается при входе, если изменилась политика"""
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            response = self.client.post(
+                self.url,
+                {"email": "throttle@example.com", "password": "ThrottlePass123"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_concurrent_attempts_do_not_exceed_rate(self):
+        """Параллельные попытки не проскакивают между чтением и записью"""
+        request = APIRequestFactory().post(self.url)
+        barrier = threading.Barrier(10)
+        results = []
+
+        def attempt():
+            throttle = LoginIPThrottle()
+            barrier.wait()
+            results.append(throttle.allow_request(request, None))
+
+        with mock.patch.object(LoginIPThrottle, "get_rate", return_value="3/min"):
+            threads = [threading.Thread(target=attempt) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results.count(True), 3)
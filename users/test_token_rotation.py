@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from users import revocation
+from users.models import RevokedToken, User
+
+
+class TokenRotationTests(APITestCase):
+    """Тесты ротации refresh-токенов"""
+
+    def setUp(self):
+        cache.clear()
+        revocation.clear_local_cache()
+        User.objects.create_user(email="rotate@example.com", password="RotatePass123")
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": "rotate@example.com", "password": "RotatePass123"},
+            format="json",
+        )
+        self.refresh = response.data["refresh"]
+        self.url = reverse("token_refresh")
+
+    def test_refresh_rotates_and_revokes_old_token(self):
+        """Старый refresh после ротации больше не принимается"""
+        response = self.client.post(self.url, {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("refresh", response.data)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+        response = self.client.post(self.url, {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_token_checked_in_db_without_local_cache(self):
+        """Отзыв виден другим процессам через таблицу"""
+        self.client.post(self.url, {"refresh": self.refresh}, format="json")
+        revocation.clear_local_cache()
+
+        response = self.client.post(self.url, {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_does_not_select_revoked_tokens(self):
+        """При ротации повтор ловится вставкой, без предварительного SELECT"""
+        table = RevokedToken._meta.db_table
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                self.url, {"refresh": self.refresh}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        selects = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and table in q["sql"]
+        ]
+        self.assertEqual(selects, [])
+
+    def test_prune_removes_only_expired(self):
+        """Очистка удаляет только истекшие записи"""
+        now = timezone.now()
+        RevokedToken.objects.create(jti="old", expires_at=now - timedelta(minutes=1))
+        RevokedToken.objects.create(jti="fresh", expires_at=now + timedelta(days=1))
+
+        self.assertEqual(revocation.prune_expired(), 1)
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)), ["fresh"]
+        )
+
+    def test_prune_in_batches(self):
+        """Очистка идет пачками и удаляет все истекшие записи"""
+        expired = timezone.now() - timedelta(minutes=1)
+        RevokedToken.objects.bulk_create(
+            RevokedToken(jti=f"old-{i}", expires_at=expired) for i in range(5)
+        )
+
+        self.assertEqual(revocation.prune_expired(batch_size=2), 5)
+        self.assertFalse(RevokedToken.objects.exists())
@@ -0,0 +1,89 @@
+# users/throttling.py
+import hashlib
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Скользящее окно на атомарных счетчиках общего кеша.
+
+    Ставка задается как в DRF ("20/min"). Счетчик текущего окна
+    увеличивается через cache.incr, а число запросов оценивается как
+    счетчик текущего окна плюс доля прошлого. Параллельные попытки получают
+    разные значения счетчика, поэтому пропускается не больше ставки; в
+    отличие от SimpleRateThrottle история запросов не хранится, на ключ —
+    два числа. incr атомарен в locmem, memcached и redis, но не в file.
+    """
+
+    def get_rate(self):
+        # Читаем ставки при каждом создании, чтобы работал override_settings
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            return super().get_rate()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f"{self.key}:{window}"
+        # Окно живет два периода: следующему нужен его итог
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.count = self.cache.incr(current_key)
+        except ValueError:  # ключ вытеснен между add и incr
+            self.cache.add(current_key, 1, self.duration * 2)
+            self.count = 1
+        self.previous = self.cache.get(f"{self.key}:{window - 1}", 0)
+
+        elapsed = (self.now % self.duration) / self.duration
+        if self.previous * (1 - elapsed) + self.count <= self.num_requests:
+            return True
+
+        # Отклоненная попытка не занимает место в окне
+        self.cache.decr(current_key)
+        self.count -= 1
+        return False
+
+    def wait(self):
+        elapsed = self.now % self.duration
+        free = self.num_requests - self.count - 1
+        if self.previous and free >= 0:
+            # Ждем, пока доля прошлого окна не уменьшится настолько,
+            # чтобы освободилось место
+            return max((1 - free / self.previous) * self.duration - elapsed, 0)
+        return self.duration - elapsed
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """Ограничение попыток входа с одного IP."""
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    """Ограничение попыток входа в один аккаунт (по email)."""
+
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        email = data.get("email") if hasattr(data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Хешируем, чтобы произвольный ввод не попадал в ключ кеша как есть
+        ident = hashlib.sha1(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,6 +1,6 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import UserCreateView, UserRetrieveUpdateView
+from rest_framework_simplejwt.views import TokenRefreshView
+from .views import UserCreateView, UserRetrieveUpdateView, ThrottledTokenObtainPairView
 from .views import PasswordResetView, PasswordResetConfirmView
 
 urlpatterns = [
@@ -10,7 +10,7 @@ urlpatterns = [
         PasswordResetConfirmView.as_view(),
         name="reset-password-confirm",
     ),
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path("token/", ThrottledTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("user/register/", UserCreateView.as_view(), name="user-register"),
     path("user/me/", UserRetrieveUpdateView.as_view(), name="user-me"),
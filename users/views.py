@@ -1,6 +1,8 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.views import TokenObtainPairView
+from ads.purge import schedule_user_deletion
 from .models import User
 from .serializers import UserSerializer, UserCreateSerializer
 from rest_framework import generics, status
@@ -11,6 +13,17 @@ from django.utils.encoding import force_bytes
 from django.core.mail import send_mail
 from django.conf import settings
 from .serializers import PasswordResetSerializer, PasswordResetConfirmSerializer
+from .throttling import LoginIPThrottle, LoginEmailThrottle
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """Выдача JWT с ограничением частоты попыток.
+
+    Троттлинг выполняется в initial() до разбора учетных данных, поэтому
+    отклоненные запросы не тратят время на хеширование пароля.
+    """
+
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
 
 class PasswordResetView(generics.GenericAPIView):
@@ -77,9 +90,14 @@ class UserCreateView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
-class UserRetrieveUpdateView(generics.RetrieveUpdateAPIView):
+class UserRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
         return self.request.user
+
+    def perform_destroy(self, instance):
+        # Аккаунт деактивируется сразу, объявления и комментарии
+        # удаляются в фоне пачками (см. ads.purge)
+        schedule_user_deletion(instance)